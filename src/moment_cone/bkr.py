@@ -39,17 +39,34 @@ def Search_Zero_a(
     return False    
 
 
-def ListNonZeroLR(nu : Partition, delta: list[int], l: int) -> list[EnhancedPartitionList]:
+#: Memoization of ListNonZeroLR, indexed by (nu, delta, l)
+list_non_zero_lr_cache: LRUCache[tuple[Partition, tuple[int, ...], int], tuple[EnhancedPartitionList, ...]] = LRUCache(maxsize=2**14)
+
+def ListNonZeroLR(nu : Partition, delta: Sequence[int], l: int) -> tuple[EnhancedPartitionList, ...]:
     """
     Enumerate the list of partitions such that |lambda_i|=delta_i and l(lambda_i)<=l 
     and the multi-LR coefficient c(nu;lambda_i)!=0.
     Compute also this LR coefficient.
     The output is a list of EnhancedPartitionList that have an attribute mult stocking the LR-coef.
+
+    The result is memoized (in a bounded cache) and thus shared between the calls:
+    the returned EnhancedPartitionList must not be modified.
     """
-    res: list[EnhancedPartitionList] = []
-    s=len(delta)
     if not isinstance(nu, Partition):
         nu=Partition(nu)
+    key = (nu, tuple(delta), l)
+    try:
+        return list_non_zero_lr_cache[key]
+    except KeyError:
+        result = tuple(_list_non_zero_lr(nu, key[1], l))
+        list_non_zero_lr_cache[key] = result
+        return result
+
+
+def _list_non_zero_lr(nu : Partition, delta: tuple[int, ...], l: int) -> list[EnhancedPartitionList]:
+    """ Computation kernel of ListNonZeroLR """
+    res: list[EnhancedPartitionList] = []
+    s=len(delta)
     if s==0 :
         if len(nu) == 0 or nu[0]==0 :
             return [EnhancedPartitionList([Partition([0])],1)]
@@ -77,27 +94,20 @@ def ListNonZeroLR(nu : Partition, delta: list[int], l: int) -> list[EnhancedPart
         return res
 
     L2=ListNonZeroLR(nu,[delta[0],sum(nu)-delta[0]],l)
-    # Extraction and uniquify of the mus TODO : améliorer la façon d'uniquifier 
-    List_mus1=[list_part_plus.partitions[1] for list_part_plus in L2]
-    List_mus=[]
-    for mu in List_mus1 :
-        if mu not in List_mus:
-            List_mus.append(mu)
-
-          
-    for mu in List_mus :
-        Ls_minus_one=ListNonZeroLR(mu,delta[1:],l)
-        for list_lambda_queu in ListNonZeroLR(mu,delta[1:],l):
-            for list_lambda_start in L2 :
-                if list_lambda_start.partitions[1]==mu:
-                    res.append(EnhancedPartitionList([list_lambda_start.partitions[0]]+list_lambda_queu.partitions,list_lambda_start.mult*list_lambda_queu.mult))
-   
-    ## Fusion of res by adding multiplicities TODO : ce que j'ai fait est moche et pas efficace pour zipper
+    # Grouping the first partitions (and their multiplicities) by the second one mu
+    starts_by_mu: dict[Partition, list[tuple[Partition, int]]] = defaultdict(list)
+    for list_lambda_start in L2:
+        starts_by_mu[list_lambda_start.partitions[1]].append(
+            (list_lambda_start.partitions[0], list_lambda_start.mult)
+        )
+
+    # Fusion of the results by adding multiplicities
     zipped_dic: dict[tuple[Partition, ...], int] = defaultdict(int)
-    for obj in res:
-        zipped_dic[tuple(obj.partitions)] += obj.mult
+    for mu, starts in starts_by_mu.items():
+        for list_lambda_queu in ListNonZeroLR(mu,delta[1:],l):
+            for lambda_start, mult_start in starts:
+                zipped_dic[(lambda_start, *list_lambda_queu.partitions)] += mult_start * list_lambda_queu.mult
 
-    # Création de la nouvelle liste d'objets
     return [EnhancedPartitionList(list(p),m) for p,m in zipped_dic.items()]
     
 
@@ -153,28 +163,113 @@ def all_lambda_matrix(delta: Sequence[int], max_length: Array2D[int], kro: Krone
 
 # TODO: dedicated file like for Kronecker?
 class PlethysmCache:
-    """ Cache for the Plethysm product """
-    _cache: dict[tuple[Partition, Partition], dict[Partition, int]]
-    _hit: int
-    _miss: int
+    """
+    Cache for the Plethysm product
+
+    The size of the cache can be limited to maxsize decompositions, the least
+    recently used ones being evicted first.
 
-    def __init__(self) -> None:
-        self._cache = dict()
-        self._hit = 0
-        self._miss = 0
+    Like for `KroneckerCoefficientCache`, the cache can be loaded from, saved
+    in or merged into a lzma-compressed pickle file.
+
+    If track_computed is True, the computed decompositions are also recorded
+    until they are retrieved by `pop_computed` (e.g. to send them from a parallel
+    worker to the main process).
+    """
+    _cache: LRUCache[tuple[Partition, Partition], dict[Partition, int]]
+    _computed: Optional[dict[tuple[Partition, Partition], dict[Partition, int]]]
+
+    def __init__(self, file_prefix: Optional[str] = None, maxsize: Optional[int] = None, track_computed: bool = False) -> None:
+        self._cache = LRUCache(maxsize)
+        self._computed = dict() if track_computed else None
+
+        if file_prefix is not None:
+            self.load_cache(file_prefix)
+
+    def load_cache(self, file_prefix: str, clear: bool = False) -> None:
+        """ Load cache from given filename prefix (will append .pkl.xz) """
+        if clear:
+            self._cache.clear()
+
+        import lzma, pickle
+        with lzma.open(file_prefix + ".pkl.xz", "rb") as fh:
+            self._cache.update(pickle.load(fh))
+
+    def save_cache(self, file_prefix: str) -> None:
+        """
+        Save cache in given filename prefix (will append .pkl.xz)
+
+        The file is replaced atomically so that a concurrent run can still read the previous version.
+        """
+        import lzma, pickle, os
+        file_name = file_prefix + ".pkl.xz"
+        tmp_name = f"{file_name}.{os.getpid()}.tmp"
+        with lzma.open(tmp_name, "wb") as fh:
+            pickle.dump(dict(self.cache_items()), fh)
+        os.replace(tmp_name, file_name)
+
+    def merge_cache(self, file_prefix: str) -> int:
+        """
+        Merge the cache into the one saved in given filename prefix (will append .pkl.xz)
+
+        Unlike `save_cache`, the decompositions of the file that are no more in the cache
+        (e.g. evicted ones) are kept. The file is created if it doesn't exist and is
+        replaced atomically. Returns the number of decompositions added to the file.
+        """
+        import lzma, os, pickle
+        file_name = file_prefix + ".pkl.xz"
+        cache: dict[tuple[Partition, Partition], dict[Partition, int]] = dict()
+        if os.path.exists(file_name):
+            with lzma.open(file_name, "rb") as fh:
+                cache = pickle.load(fh)
+        previous_size = len(cache)
+        cache.update(self.cache_items())
+
+        tmp_name = f"{file_name}.{os.getpid()}.tmp"
+        with lzma.open(tmp_name, "wb") as fh:
+            pickle.dump(cache, fh)
+        os.replace(tmp_name, file_name)
+        return len(cache) - previous_size
+
+    def cache_items(self) -> Iterable[tuple[tuple[Partition, Partition], dict[Partition, int]]]:
+        """ Decompositions currently known by the cache """
+        return self._cache.items()
+
+    def update(self, items: Iterable[tuple[tuple[Partition, Partition], dict[Partition, int]]]) -> None:
+        """ Add the given decompositions (e.g. computed by another process) to the cache """
+        self._cache.update(dict(items))
+
+    def pop_computed(self) -> list[tuple[tuple[Partition, Partition], dict[Partition, int]]]:
+        """ Decompositions computed since the last call (needs track_computed) """
+        assert self._computed is not None, "The computed decompositions are not tracked"
+        computed = list(self._computed.items())
+        self._computed.clear()
+        return computed
+
+    @property
+    def hits(self) -> int:
+        """ Number of decompositions found in the cache """
+        return self._cache.hits
+
+    @property
+    def misses(self) -> int:
+        """ Number of computed decompositions """
+        return self._cache.misses
+
+    @property
+    def evictions(self) -> int:
+        """ Number of decompositions evicted from the cache """
+        return self._cache.evictions
 
     def __sym_f(self, p: Partition) -> Any:
         return sym_f(tuple(p))
     
     def product(self, lhs: Partition, rhs: Partition) -> dict[Partition, int]:
         try:
-            result_from_cache = self._cache[(lhs, rhs)]
-            self._hit += 1
-            return result_from_cache
+            return self._cache[(lhs, rhs)]
         except KeyError:
             pass
 
-        self._miss += 1
         # Product using Sage
         product = self.__sym_f(lhs).plethysm(self.__sym_f(rhs))
 
@@ -184,13 +279,16 @@ class PlethysmCache:
             # Forcing int coefficients to remove Sage custom Integer type
             result[Partition(map(int, monomial))] = int(coeff)
         self._cache[(lhs, rhs)] = result
+        if self._computed is not None:
+            self._computed[(lhs, rhs)] = result
         return result
     
     def __call__(self, a: Partition, b: Partition, c: Partition) -> int:
         return self.product(a, b).get(c, 0)
 
     def __repr__(self) -> str:
-        return f"PlethysmCache(#cache={len(self._cache)}, #hit={self._hit}, #miss={self._miss})"
+        evictions_str = "" if self._cache.maxsize is None else f", #eviction={self.evictions}"
+        return f"PlethysmCache(#cache={len(self._cache)}, #hit={self.hits}, #miss={self.misses}{evictions_str})"
 
             
 def fct_weights_of_Nu(Nu: Array2D[Partition]) -> Matrix: # Nu is a partial matrix with Partitions as entries
@@ -253,6 +351,91 @@ def ineqs_in_Nl(l: int) -> list[tuple[int, ...]]:
   return ineqs
 
 
+def delta_equations(
+        ListP: Sequence[Sequence[int]],
+        sizenu: Matrix,
+        V: Representation,
+        ) -> tuple[list[tuple[int, ...]], list[int]]:
+    """
+    Equalities A.delta = b of condition 2 of Proposition prop:multCVtau.
+
+    Returns the rows of A (non-negative integers, one column per element of ListP) and the right-hand side b.
+    """
+    l = len(ListP)
+    A: list[tuple[int, ...]] = []
+    b: list[int] = []
+    if isinstance(V, KroneckerRepresentation):
+        for k in range(sizenu.ncols()): # Run over columns of Nu
+            for i in range(sizenu.nrows()): # Run over the rows of the column
+                if sizenu[i,k]>=0:
+                    A.append(tuple(1 if ListP[j][k]==i else 0 for j in range(l)))
+                    b.append(int(sizenu[i,k]))
+    else:
+        for j in range(sizenu.nrows()):
+            A.append(tuple(int(I[j]) for I in ListP))
+            b.append(int(sizenu[j,0]))
+    return A, b
+
+
+def _nonnegative_integral_solutions(A: Sequence[Sequence[int]], b: Sequence[int], l: int) -> Optional[list[tuple[int, ...]]]:
+    """
+    Non-negative integral solutions of A.x = b, in lexicographic order, for a non-negative matrix A
+
+    The enumeration backtracks over the unknowns: each one is bounded by the remaining
+    right-hand sides of its equations and fixed by the equations where it is the last unknown.
+    Returns None if the set of solutions is not bounded (an unknown without any equation).
+    """
+    columns = [[(r, row[j]) for r, row in enumerate(A) if row[j] != 0] for j in range(l)]
+    if any(len(col) == 0 for col in columns):
+        return None
+
+    closing: list[list[tuple[int, int]]] = [[] for _ in range(l)] # Equations ending at each unknown
+    for r, row in enumerate(A):
+        nonzero = [j for j in range(l) if row[j] != 0]
+        if len(nonzero) == 0:
+            if b[r] != 0:
+                return []
+        else:
+            closing[nonzero[-1]].append((r, row[nonzero[-1]]))
+
+    points: list[tuple[int, ...]] = []
+    x = [0] * l
+    remaining = list(b)
+
+    def backtrack(j: int) -> None:
+        if j == l:
+            points.append(tuple(x))
+            return
+        lower = 0
+        upper = min(remaining[r] // a for r, a in columns[j])
+        for r, a in closing[j]:
+            if remaining[r] < 0 or remaining[r] % a != 0:
+                return
+            lower = max(lower, remaining[r] // a)
+            upper = min(upper, remaining[r] // a)
+        for v in range(lower, upper + 1):
+            for r, a in columns[j]:
+                remaining[r] -= a * v
+            x[j] = v
+            backtrack(j + 1)
+            for r, a in columns[j]:
+                remaining[r] += a * v
+        x[j] = 0
+
+    backtrack(0)
+    return points
+
+
+def _enumerate_delta_polyhedron(A: Sequence[Sequence[int]], b: Sequence[int], l: int) -> tuple[int, tuple[Vector, ...]]:
+    """ Dimension and integral points of {delta in N^l, A.delta = b} computed with a Sage Polyhedron """
+    eqs = [tuple([-bi] + list(row)) for row, bi in zip(A, b)]
+    PP=Polyhedron(ieqs=ineqs_in_Nl(l),eqns=eqs)
+    return PP.dim(), PP.integral_points()
+
+
+#: Memoization of Enumerate_delta, indexed by (ListP, sizenu, Kronecker case)
+enumerate_delta_cache: LRUCache[tuple[tuple[tuple[int, ...], ...], tuple[tuple[int, ...], ...], bool], tuple[int, tuple[Vector, ...]]] = LRUCache(maxsize=2**12)
+
 def Enumerate_delta(
         ListP: list[list[int]],
         sizenu: Matrix,
@@ -263,39 +446,57 @@ def Enumerate_delta(
     return the list of possible weight vectors delta. That is satisfying condition 2 of Proposition prop:multCVtau.
     delta is a vector of nonnegative integers of size len(ListP).
 
-    output : of list of integer vectors. sizenu a partial matrix of int as list of columns. ListP ??
+    output : the dimension of the polyhedron of the real solutions and the list of integer vectors.
+    sizenu a partial matrix of int as list of columns. ListP ??
+
+    The integral points are enumerated by backtracking over the (non-negative) equalities.
+    The dimension is deduced from the affine hull of these points when it reaches
+    its upper bound; otherwise (rare) it is computed by a Sage Polyhedron.
+    The result is memoized on (ListP, sizenu) since many inequalities share the same tau.
     """
-    # Polyhedron in Z^l
-    l=len(ListP)
-    # Polyhedron in N^l
-    ineqs=ineqs_in_Nl(l)
-    eqs: list[tuple[int, ...]] = []
-    if isinstance(V, KroneckerRepresentation): 
-        # equalities corresponding to conditions 2
-        for k in range(sizenu.ncols()): # Run over columns of Nu
-            for i in range(sizenu.nrows()): # Run over the rows of the column
-                if sizenu[i,k]>=0:
-                    v: list[int] = [-sizenu[i,k]]
-                    for j in range(l):
-                        if ListP[j][k]==i:
-                            v.append(1)
-                        else:
-                            v.append(0)
-                    eqs.append(tuple(v))
-    else:
-        
-        for j in range(sizenu.nrows()):
-            eqs.append(tuple([-sizenu[j,0]]+[I[j] for I in ListP]))            
-    #Create the polyhedron        
-    PP=Polyhedron(ieqs=ineqs,eqns=eqs)
+    key = (
+        tuple(map(tuple, ListP)),
+        tuple(tuple(int(c) for c in row) for row in sizenu.rows()),
+        isinstance(V, KroneckerRepresentation),
+    )
+    try:
+        return enumerate_delta_cache[key]
+    except KeyError:
+        pass
 
-    #Return the integral points
-    return PP.dim(), PP.integral_points()
+    l=len(ListP)
+    A, b = delta_equations(ListP, sizenu, V)
+
+    # Unknowns forced to 0 by an equation with a zero right-hand side
+    forced_zero = {j for row, bi in zip(A, b) if bi == 0 for j in range(l) if row[j] != 0}
+    free = [j for j in range(l) if j not in forced_zero]
+
+    points = _nonnegative_integral_solutions(A, b, l)
+    result: Optional[tuple[int, tuple[Vector, ...]]] = None
+    if points is not None and len(points) > 0:
+        # Upper bound of the dimension, reached iff there is a point with positive free coordinates
+        A_free = matrix(ZZ, len(A), len(free), [[row[j] for j in free] for row in A])
+        max_dim = len(free) - A_free.rank()
+        p0 = vector(ZZ, points[0])
+        hull_dim = matrix(ZZ, len(points) - 1, l, [list(vector(ZZ, p) - p0) for p in points[1:]]).rank()
+        if hull_dim == max_dim:
+            vectors = []
+            for p in points:
+                v = vector(ZZ, p)
+                v.set_immutable()
+                vectors.append(v)
+            result = hull_dim, tuple(vectors)
+
+    if result is None:
+        result = _enumerate_delta_polyhedron(A, b, l)
+
+    enumerate_delta_cache[key] = result
+    return result
 
 
 #TODO : déplacer dans utils
 def Product_of_Tables(
-        table_of_lists: OptionalArray2D[list[EnhancedPartitionList]]
+        table_of_lists: OptionalArray2D[Sequence[EnhancedPartitionList]]
         ) -> list[OptionalArray2D[EnhancedPartitionList]]:
     """
     The entry is a bi-dimesional table of EnhancedPartitionList. Produce the list of Tables obtained by picking (a product) one element in each list.
@@ -313,7 +514,7 @@ def Product_of_Tables(
                 table_of_lists[i,j] = [0] # type: ignore
                 Inone.append((i, j))
 
-    clean_table_of_lists = cast(Array2D[list[EnhancedPartitionList]], table_of_lists)
+    clean_table_of_lists = cast(Array2D[Sequence[EnhancedPartitionList]], table_of_lists)
     
     for p in itertools.product(*clean_table_of_lists.ravel()):
         T = optional_array(table_of_lists.shape, dtype=EnhancedPartitionList)
@@ -370,7 +571,7 @@ def multiplicity_SV_tau_particle(
 
     for delta in Delta[1]: # Run over the dela satisfying Condition 2
         s=len(tau.reduced.mult[0]) #[0] for the first (and unique) bloc
-        table_Mu = optional_array((s, 1), dtype=list[EnhancedPartitionList]) # table_Mu[i] will be the list of possible columns i for Mu
+        table_Mu = optional_array((s, 1), dtype=Sequence[EnhancedPartitionList]) # table_Mu[i] will be the list of possible columns i for Mu
         for j in range(s):
             max_length = tau.reduced.mult[0][j]
             table_Mu[j,0]=ListNonZeroLR(Nu[j,0],[ListP[i][j]*delta[i] for i in range(len(ListP))],max_length)
@@ -473,70 +674,51 @@ def multiplicity_SV_tau_kronecker(
     if checkGreatEq2 and tau.is_dom_reg : # In this case we only need to check the dimension of the polyhedron of delta's
         return Delta[0]==0
    
+    Vanishing_rows: set[tuple[Partition, ...]] = set() # Rows of Lambda with a zero Kronecker coefficient
     for delta in Delta[1]: # Run over the dela satisfying Condition 2
         # Run over entries of Nu
         p,s = Nu.shape
-        table_Lambda = optional_array((p, s), dtype=list[EnhancedPartitionList])
+        table_Lambda = optional_array((p, s), dtype=Sequence[EnhancedPartitionList])
+        table_indices = optional_array((p, s), dtype=list[int]) # Indices of the rows of Lambda associated to each entry of Nu
         for k in range(s): # Two loops to run over the entries of Nu
             i=0
             while i < p and Nu[i,k] is not None:
                 Indices=[j for j,I in enumerate(ListP) if ListP[j][k]==i]
                 max_length = tau.reduced.mult[k][i]
-                LNZ = ListNonZeroLR(Nu[i,k],[delta[j] for j in Indices],max_length) # A list of ListPartPlus with Indices=None
-                ## Add indices
-                for l in LNZ:
-                    l.indices = Indices
-                table_Lambda[i,k] = LNZ
+                table_Lambda[i,k] = ListNonZeroLR(Nu[i,k],[delta[j] for j in Indices],max_length) # A list of ListPartPlus with Indices=None
+                table_indices[i,k] = Indices
                 i+=1
 
-        List_of_Lambdas = Product_of_Tables(table_Lambda)
-        List_of_Lambdas_plugged: list[tuple[OptionalArray2D[Partition], int]] = []
-        for Lambda_tilde in List_of_Lambdas :
+        # Lazy product of the lists of the entries of Nu, each row of Lambda being
+        # tested against the rows already known to have a zero Kronecker coefficient
+        cells = [(i, k) for k in range(s) for i in range(p) if table_Lambda[i, k] is not None]
+        for Lambda_tilde in itertools.product(*(cast(Sequence[EnhancedPartitionList], table_Lambda[i, k]) for i, k in cells)):
             LR=1
-            Lambda = optional_array((len(ListP), s), dtype=Partition)
-            
-            for k in range(s):
-                i=0
-                while i < p and Lambda_tilde[i, k] is not None:
-                    lt = Lambda_tilde[i, k]
-                    assert lt is not None and lt.indices is not None
-                    LR *= lt.mult
-                    for j,la in zip(lt.indices, lt.partitions):
-                        Lambda[j,k]=la
-                    i+=1
-            List_of_Lambdas_plugged.append((Lambda,LR))
-            
-        i=0
-        while i<len(List_of_Lambdas_plugged):
-            Lambda_tilde_plugged = List_of_Lambdas_plugged[i]
+            Lambda = empty_array((len(ListP), s), dtype=Partition)
+            for (i, k), lt in zip(cells, Lambda_tilde):
+                Indices = table_indices[i, k]
+                assert Indices is not None
+                LR *= lt.mult
+                for j,la in zip(Indices, lt.partitions):
+                    Lambda[j,k]=la
+
             K_coeff=1
             for j in range(len(ListP)) :
-                L = Lambda_tilde_plugged[0][j,:]
+                L = tuple(Lambda[j,:])
                 assert all(Li is not None for Li in L)
-                K = kronecker(cast(Array1D[Partition], L).tolist())
-
+                if L in Vanishing_rows:
+                    K_coeff=0
+                    break # Unuseful to consider the other rows of Lambda_tilde
+                K = kronecker(list(L))
                 if K !=0 :
-                    K_coeff*=K                                                
+                    K_coeff*=K
                 else:
-                    ## Cancel the Lambda's having this row and hence giving K=0
-                    #TODO : peut-on faire mieux que ça ?
-                    to_be_deleted=[]
-                    for i2, Lambda_tilde2_plugged in  enumerate(reversed(List_of_Lambdas_plugged[i+1:])):
-                        for j2 in range(len(ListP)) :
-                            L2=Lambda_tilde2_plugged[0][j2,:]
-                            if all(x ==y for x,y in zip(L2,L)) :
-                                to_be_deleted.append(i2)
-                                break
-                    leng=len(List_of_Lambdas_plugged)
-                    # TODO : ici on enregistre les effacements à faire puis on les fait. On peut sans doute effacer à mesure mais j'avais des erreurs. Sans doute pour des mauvaises raisons. 
-                    for idx in to_be_deleted:
-                        del List_of_Lambdas_plugged[leng-idx-1]
+                    Vanishing_rows.add(L)
                     K_coeff=0
                     break # Unuseful to consider the other rows of Lambda_tilde
-            mult+=Lambda_tilde_plugged[1]*K_coeff    
+            mult+=LR*K_coeff
             if checkGreatEq2 and mult>1:
                 return(False)        
-            i+=1    
                 
     if checkGreatEq2:
         return True
@@ -0,0 +1,310 @@
+"""
+Character table of the symmetric group
+
+It is used to compute Kronecker coefficients without Sage: the Kronecker
+coefficient of the partitions l1, ..., lk of n is
+
+    g(l1, ..., lk) = 1/n! sum_rho |C_rho| chi^l1(rho) ... chi^lk(rho)
+
+where the sum runs over the conjugacy classes C_rho of S_n and chi^l is the
+irreducible character associated to the partition l.
+
+The characters are computed with the Murnaghan-Nakayama rule, using the
+beta-numbers (abacus) of the partitions to remove the border strips. The rule
+is applied to whole columns of the table at once: the column of the class
+(r,) + mu is a signed sum of rows of the column of mu, one for each bead
+that can be moved down by r.
+
+The coefficients are computed modulo several primes below 2^31 with int64
+arithmetic and then recovered by the Chinese remainder theorem, since they
+are bounded by the product of the degrees of the characters.
+"""
+
+__all__ = (
+    "partitions_of",
+    "class_sizes",
+    "character_table",
+    "kronecker_from_characters",
+)
+
+import functools
+import itertools
+import math
+import numpy as np
+from numpy.typing import NDArray
+
+from .typing import *
+from .partition import Partition
+from .modular import MODULAR_PRIME
+
+#: Largest n so that the characters of S_n fit in an int64 (|chi| <= sqrt(n!))
+INT64_MAX_N: Final[int] = 33
+
+
+@functools.cache
+def partitions_of(n: int) -> tuple[Partition, ...]:
+    """
+    Partitions of n in the order of the rows and columns of `character_table`
+
+    >>> partitions_of(3)
+    (Partition((3,)), Partition((2, 1)), Partition((1, 1, 1)))
+    """
+    return tuple(Partition(p, check=False) for p in _partition_tuples(n, n))
+
+
+@functools.cache
+def _partition_tuples(n: int, max_part: int) -> tuple[tuple[int, ...], ...]:
+    """
+    Partitions of n with parts at most max_part, in the order of `Partition.all_for_integer`
+
+    The tails are shared by the partitions of the different integers.
+    """
+    if n == 0:
+        return ((),)
+    return tuple(
+        (head,) + tail
+        for head in range(min(n, max_part), 0, -1)
+        for tail in _partition_tuples(n - head, head)
+    )
+
+
+@functools.cache
+def _partition_index(n: int) -> dict[tuple[int, ...], int]:
+    return {p: i for i, p in enumerate(_partition_tuples(n, n))}
+
+
+@functools.cache
+def _centralizer_sizes(n: int) -> tuple[int, ...]:
+    """ Sizes n! / |C_rho| of the centralizers of the classes of S_n """
+    sizes: list[int] = []
+    for rho in _partition_tuples(n, n):
+        z = 1
+        for part, mult in itertools.groupby(rho):
+            m = len(list(mult))
+            z *= part**m * math.factorial(m)
+        sizes.append(z)
+    return tuple(sizes)
+
+
+@functools.cache
+def class_sizes(n: int) -> NDArray[Any]:
+    """
+    Sizes of the conjugacy classes of S_n (as Python integers)
+
+    >>> class_sizes(3)
+    array([2, 3, 1], dtype=object)
+    """
+    sizes = np.empty(len(_partition_tuples(n, n)), dtype=object)
+    sizes[:] = [math.factorial(n) // z for z in _centralizer_sizes(n)]
+    return sizes
+
+
+def _remove_border_strips(p: tuple[int, ...], r: int) -> Iterator[tuple[int, tuple[int, ...], int]]:
+    """
+    Partitions obtained by removing a border strip of size r from p
+
+    Yields the index of the moved bead, the resulting partition and the sign of the strip.
+    """
+    length = len(p)
+    beta = [part + length - 1 - i for i, part in enumerate(p)] # Decreasing beta-numbers
+    beads = set(beta)
+    for i, b in enumerate(beta):
+        if b - r >= 0 and b - r not in beads:
+            height = sum(1 for c in beta if b - r < c < b)
+            new_beta = sorted(beads - {b} | {b - r}, reverse=True)
+            yield (
+                i,
+                tuple(c - (length - 1 - j) for j, c in enumerate(new_beta) if c - (length - 1 - j) > 0),
+                -1 if height % 2 else 1,
+            )
+
+
+@functools.cache
+def _strip_maps(n: int, r: int) -> tuple[tuple[NDArray[np.intp], NDArray[np.intp], NDArray[np.int64]], ...]:
+    """
+    Removal of the border strips of size r from the partitions of n, grouped by moved bead
+
+    Each group is made of the indices of the partitions of n (without repetition),
+    the indices of the resulting partitions of n - r and the signs of the strips.
+    """
+    index = _partition_index(n - r)
+    groups: dict[int, tuple[list[int], list[int], list[int]]] = {}
+    for row, p in enumerate(_partition_tuples(n, n)):
+        for bead, q, sign in _remove_border_strips(p, r):
+            rows, cols, signs = groups.setdefault(bead, ([], [], []))
+            rows.append(row)
+            cols.append(index[q])
+            signs.append(sign)
+    return tuple(
+        (np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp), np.array(signs, dtype=np.int64))
+        for rows, cols, signs in groups.values()
+    )
+
+
+@functools.cache
+def _character_table(n: int) -> NDArray[Any]:
+    dtype = np.int64 if n <= INT64_MAX_N else object
+    classes = _partition_tuples(n, n)
+
+    # Suffixes of the classes, by integer: the column of the class (r,) + mu
+    # is computed from the one of mu by removing border strips of size r
+    suffixes: dict[int, set[tuple[int, ...]]] = {}
+    for rho in classes:
+        for k in range(1, len(rho) + 1):
+            suffixes.setdefault(sum(rho[k - 1:]), set()).add(rho[k - 1:])
+
+    columns: dict[tuple[int, ...], NDArray[Any]] = {(): np.ones(1, dtype=dtype)}
+    for m in sorted(suffixes):
+        for r, group in itertools.groupby(sorted(suffixes[m]), key=lambda rho: rho[0]):
+            group_classes = list(group)
+            tails = np.stack([columns[rho[1:]] for rho in group_classes], axis=1)
+            block = np.zeros((len(_partition_tuples(m, m)), len(group_classes)), dtype=dtype)
+            for rows, cols, signs in _strip_maps(m, r):
+                block[rows] += signs[:, None].astype(dtype) * tails[cols]
+            for j, rho in enumerate(group_classes):
+                columns[rho] = block[:, j]
+
+    table = np.stack([columns[rho] for rho in classes], axis=1)
+    table.flags.writeable = False
+    return table
+
+
+def character_table(n: int, cache_dir: Optional[str] = None) -> NDArray[Any]:
+    """
+    Character table of S_n: entry (i, j) is the character of the i-th partition
+    evaluated on the class of the j-th partition (see `partitions_of`)
+
+    The table is cached per process and, if cache_dir is given, saved in
+    (and loaded from) a .npy file of this directory.
+
+    >>> character_table(3)
+    array([[ 1,  1,  1],
+           [-1,  0,  2],
+           [ 1, -1,  1]])
+    """
+    if cache_dir is None:
+        return _character_table(n)
+
+    import os
+    file_name = os.path.join(cache_dir, f"character_table_{n}.npy")
+    if os.path.exists(file_name):
+        table = np.load(file_name, allow_pickle=n > INT64_MAX_N)
+        table.flags.writeable = False
+        return table
+
+    table = _character_table(n)
+    # Atomic creation since concurrent processes may save the same table
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_name = f"{file_name}.{os.getpid()}.tmp"
+    with open(tmp_name, "wb") as fh:
+        np.save(fh, table, allow_pickle=n > INT64_MAX_N)
+    os.replace(tmp_name, file_name)
+    return table
+
+
+@functools.cache
+def _prime(k: int) -> int:
+    """ k-th prime below MODULAR_PRIME (included), in decreasing order """
+    from flint import fmpz # type: ignore
+    p = MODULAR_PRIME if k == 0 else _prime(k - 1) - 1
+    while not fmpz(p).is_prime():
+        p -= 1
+    return p
+
+
+def _primes_above(bound: int) -> list[int]:
+    """ Primes (see `_prime`) whose product is greater than bound """
+    primes: list[int] = []
+    modulus = 1
+    while modulus <= bound:
+        primes.append(_prime(len(primes)))
+        modulus *= primes[-1]
+    return primes
+
+
+def _crt(residues: Sequence[NDArray[np.int64]], primes: Sequence[int]) -> NDArray[Any]:
+    """ Non-negative integers (as Python integers) less than the product of the primes with the given residues """
+    modulus = math.prod(primes)
+    result = np.zeros(len(residues[0]), dtype=object)
+    for res, p in zip(residues, primes):
+        cofactor = modulus // p
+        result += res.astype(object) * (cofactor * pow(cofactor, -1, p))
+    return result % modulus
+
+
+def _weighted_mod_p(rows: NDArray[Any], n: int, p: int) -> NDArray[np.int64]:
+    """ Product of the given rows of the character table divided by the centralizer sizes, modulo p """
+    weighted = np.ones(rows.shape[1], dtype=np.int64)
+    for row in np.mod(rows, p).astype(np.int64):
+        weighted = weighted * row % p
+    return weighted * _inverse_centralizer_sizes(n, p) % p
+
+
+@functools.cache
+def _inverse_centralizer_sizes(n: int, p: int) -> NDArray[np.int64]:
+    """ Inverses modulo p of the centralizer sizes of the classes of S_n """
+    return np.array([pow(z, -1, p) for z in _centralizer_sizes(n)], dtype=np.int64)
+
+
+#: Number of rows of the character table reduced at once modulo a prime
+_BLOCK_ROWS: Final[int] = 256
+
+
+def kronecker_from_characters(
+        partitions: Sequence[Partition],
+        last: Optional[Partition] = None,
+        cache_dir: Optional[str] = None,
+    ) -> dict[Partition, int] | int:
+    """
+    Kronecker product of partitions of a same integer computed from the character table
+
+    Returns the decomposition of the product as a dictionary of the non-zero
+    coefficients or, if last is given, only the coefficient of last.
+
+    Since sum_rho 1 / z_rho = 1, the coefficients are non-negative integers bounded
+    by the product of the degrees of the characters: they are computed modulo enough
+    primes below 2^31 (greater than n so that the centralizer sizes z_rho are
+    invertible) with int64 arithmetic, and recovered by the Chinese remainder theorem.
+
+    >>> a, b = Partition(2, 1), Partition(2, 1)
+    >>> kronecker_from_characters((a, b))
+    {Partition((3,)): 1, Partition((2, 1)): 1, Partition((1, 1, 1)): 1}
+    >>> kronecker_from_characters((a, b), Partition(2, 1))
+    1
+    """
+    n = sum(partitions[0])
+    if any(sum(p) != n for p in partitions) or (last is not None and sum(last) != n):
+        return {} if last is None else 0
+
+    table = character_table(n, cache_dir)
+    index = _partition_index(n)
+    rows = table[[index[tuple(p)] for p in partitions]]
+    degrees = table[:, index[(1,) * n]]
+    bound = math.prod(int(degrees[index[tuple(p)]]) for p in partitions)
+
+    if last is not None:
+        last_row = table[index[tuple(last)]]
+        primes = _primes_above(bound * int(degrees[index[tuple(last)]]))
+        residues = [
+            np.array([(_weighted_mod_p(rows, n, p) * np.mod(last_row, p).astype(np.int64) % p).sum() % p])
+            for p in primes
+        ]
+        return int(_crt(residues, primes)[0])
+
+    primes = _primes_above(bound * max(int(d) for d in degrees))
+    residues = []
+    for p in primes:
+        weighted = _weighted_mod_p(rows, n, p)
+        res = np.empty(len(table), dtype=np.int64)
+        for start in range(0, len(table), _BLOCK_ROWS):
+            # Residues less than 2^31: the products fit in an int64 and so do their sums
+            block = np.mod(table[start:start + _BLOCK_ROWS], p).astype(np.int64)
+            res[start:start + _BLOCK_ROWS] = (block * weighted % p).sum(axis=1) % p
+        residues.append(res)
+    coeffs = _crt(residues, primes)
+
+    partitions_n = partitions_of(n)
+    return {
+        partitions_n[i]: int(coeffs[i])
+        for i in np.flatnonzero(coeffs)
+    }
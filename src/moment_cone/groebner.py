@@ -4,7 +4,7 @@ import signal as signal
 from .typing import *
 from .tau import *
 from .inequality import *
-from .utils import filter_dict_by_key
+from .utils import filter_dict_by_key, LRUCache
 from .rings import *
 from .rings import variable
 from .vector_chooser import *
@@ -57,27 +57,78 @@ def weight_as_list(weight: Weight) -> list[int]:
         
 #TODO: define smaller polynomial rings?
 
+def modular_point(v: Vector, field: Ring) -> Vector:
+    """
+    Reduction of a vector of QQ[I] to the prime field GF(p), with p ≡ 1 mod 4
+
+    I is mapped to the square root of -1 given by `moment_cone.modular.sqrt_minus_one`.
+    """
+    from .modular import sqrt_minus_one
+    i = field(sqrt_minus_one(field.characteristic()))
+    return vector(field, [field(a) + field(b) * i for a, b in (list(x) for x in v)])
+
+
 def map_pi(V: Representation, weights_domain: Sequence[Weight], roots_domain: Sequence[Root], method: Method) -> list[Vector]:
     """ Compute the map pi (i.e. the orbit map V times U-> V restricted to V_restr times U_restr where V_restr is the subspace generated by weight spaces of the weights in "weights_domains" while U_restr is the subgroup generated by root subgroups associated to roots in "roots_domain".)
     if method is "symbolic", result is given in terms of formal variables of V_restr and formal variables of U_restr
     if method is "probabilistic", result is given as the image of a random point in V restricted (and formal variables of U_rest
+    if method is "modular", result is the same as the probabilistic one but reduced modulo p (see `modular_point`)
     """
     if method == "probabilistic":
         ring = V.QI
         bigring=V.G.QU_Q
+    elif method == "modular":
+        ring = V.QI
+        bigring = V.G.QU_Fp
     elif method == "symbolic":
         ring = V.QV
         bigring = V.QU_QV
     else:
         raise ValueError(f"Invalid value {method} of the computation method")
     
+    v: Vector = point_vect(weights_domain, V, ring, bounds=(-1000, 1000))
+    if method == "modular":
+        v = modular_point(v, bigring.sage_ring.base_ring())
+
+    # Only the polynomial construction remains, the combinatorics being in the (cached) table
+    monomials: dict[tuple[Root, ...], Any] = dict()
+    Res: list[Vector] = [0 for i in range(len(v))] #null vector
+    for source, target, roots, sign in map_pi_table(V, weights_domain, roots_domain):
+        try:
+            monomial = monomials[roots]
+        except KeyError:
+            monomial = 1
+            for root in roots:
+                monomial *= variable(ring_or_gens=bigring, id=root, seed="u")
+            monomials[roots] = monomial
+        Res[target] += sign * v[source] * monomial
+    return Res
+
+
+#: Cache of map_pi_table, indexed by (V, weights_domain, roots_domain)
+map_pi_table_cache: LRUCache[tuple[Representation, tuple[Weight, ...], tuple[Root, ...]], tuple[tuple[int, int, tuple[Root, ...], int], ...]] = LRUCache(maxsize=2**10)
+
+def map_pi_table(V: Representation, weights_domain: Sequence[Weight], roots_domain: Sequence[Root]) -> tuple[tuple[int, int, tuple[Root, ...], int], ...]:
+    """
+    Sparse description of the map pi (see `map_pi`) independent of the chosen point of V_restr
+
+    Each entry (source, target, roots, sign) means that the coordinate of index source of the point,
+    multiplied by sign and by the variables of U_restr associated to the roots,
+    contributes to the coordinate of index target of the image.
+    The table is cached since it only depends on tau and the inversions.
+    """
+    key = (V, tuple(weights_domain), tuple(roots_domain))
+    try:
+        return map_pi_table_cache[key]
+    except KeyError:
+        pass
+
     if isinstance(V, KroneckerRepresentation):
         degree = len(V.G)-1
     else:
         assert(isinstance(V, ParticleRepresentation))
         degree = V.particle_cnt
 
-    v: Vector = point_vect(weights_domain, V, ring, bounds=(-1000, 1000))
     classified_roots=classif_roots(V,roots_domain)  
     for k in range(len(classified_roots)):
         for j in range(V.G[k]):
@@ -85,40 +136,37 @@ def map_pi(V: Representation, weights_domain: Sequence[Weight], roots_domain: Se
     if isinstance(V, ParticleRepresentation):
         classified_roots *= V.particle_cnt #
 
-    Res: list[Vector] = [0 for i in range(len(v))] #null vector
-    for i, weight in enumerate(weights_domain):
+    table: list[tuple[int, int, tuple[Root, ...], int]] = []
+    for weight in weights_domain:
+        source = V.index_of_weight(weight)
+        weight_coeffs = weight_as_list(weight)
         selected_roots=[] #for each v_k in a (tensor, wedge, symmetric) product prod(v_k), we select the roots with non-zero action of the considered v_k.
         for k in range(degree):
-            selected_roots.append(classified_roots[k][weight_as_list(weight)[k]])
+            selected_roots.append(classified_roots[k][weight_coeffs[k]])
         compatible_tuples_of_roots=product(*selected_roots) #tuples of roots with non-zero action on the weight space
 
         for tuple_roots in compatible_tuples_of_roots:
             target_weight_coeffs: list[int] = [tuple_roots[k].i for k in range(degree)]
-            #print(weight,target_weight)
-            coef=1 #coefficient for the considered monomial
-            compute=True #in fermionic cases, some target weights are non-eligible (those with repetition)
-
+            sign=1
             target_weight: Weight
             if isinstance(V, ParticleRepresentation):
                 if isinstance(V, FermionRepresentation):
-                    coef=(-1)**(Permutation(target_weight_coeffs).length)#taking into account -1 sign in reordering wedge product
+                    #in fermionic cases v\wedge v=0: target weights with repetition are non-eligible
+                    if len(set(target_weight_coeffs)) < degree:
+                        continue
+                    sign=(-1)**(Permutation(target_weight_coeffs).length)#taking into account -1 sign in reordering wedge product
                 target_weight_coeffs.sort()
-
-                if isinstance(V, FermionRepresentation):
-                    compute=sum([target_weight_coeffs[i]==target_weight_coeffs[i+1] for i in range(degree-1)])==0
-
                 target_weight = WeightAsListOfList(V.G, as_list_of_list=[target_weight_coeffs])
-
             else:
                 assert(isinstance(V, KroneckerRepresentation))
                 target_weight = WeightAsList(V.G, as_list=target_weight_coeffs+[0])
 
-            for root in tuple_roots:
-                if root.i!=root.j:
-                    coef*=variable(ring_or_gens= bigring, id=root,seed="u")
-            if compute: #in fermionic cases v\wedge v=0:
-                Res[V.index_of_weight(target_weight)]+=v[V.index_of_weight(weight)]*coef
-    return Res
+            roots = tuple(root for root in tuple_roots if root.i!=root.j)
+            table.append((source, V.index_of_weight(target_weight), roots, sign))
+
+    result = tuple(table)
+    map_pi_table_cache[key] = result
+    return result
     
 
 def eq_fibre_pi(V: Representation, ineq: Inequality, method: Method) -> list[Vector]:
@@ -176,48 +224,79 @@ def is_fiber_singleton_reorder(ineq: Inequality, V: Representation, method: Meth
     for developpment purposes
     """
     return is_fiber_singleton(V,ineq,method)
-    
 
-def long_calculation(Liste: Iterable[T], function: Callable[..., U], lim: float, extra_arguments: Iterable[Any]) -> list[tuple[int, T, Optional[U]]]:
+def is_fiber_singleton_with_timeout(ineq: Inequality, V: Representation, method: Method, lim: float) -> Optional[bool]:
     """
-    For each element of Liste,
-    computes function applied to each element, (and common list of extra_arguments for each call)
-    if time of computation exceeds lim seconds, computation is stopped.
+    is_fiber_singleton with a limited wall execution time (non-positive limit to disable it)
+
+    Returns None if the computation didn't finish in lim seconds.
+    The computation runs in a separate process (see `timeout_process`) that is killed
+    when the limit is reached. In a worker process of a parallel executor (that cannot
+    have children through multiprocessing), the worker is forked instead (see `timeout_fork`):
+    an interrupted computation thus never leaves the worker, that is reused for the
+    next inequalities, in an incorrect state (unlike the `timeout` alarm).
     """
-    from .task import timeout_process, TimeOutException
-    from .utils import getLogger
-    logger = getLogger("groebner.long_calculation")
-    Res: list[tuple[int, T, Optional[U]]] = []
-    for i, l in enumerate(Liste):
-        try:
-            resl = timeout_process(function, (l, *extra_arguments), timeout=lim)
-        except TimeOutException:
-           logger.debug(f'{i} did not complete in {lim} seconds!')
-           Res.append((i, l, None))
+    import multiprocessing
+    from .task import timeout_fork, timeout_process, TimeOutException
+    try:
+        if multiprocessing.current_process().daemon:
+            return timeout_fork(is_fiber_singleton_reorder, (ineq, V, method), timeout=lim)
         else:
-          logger.debug(f'{i} completed, result is {resl}')
-          assert resl is not None
-          Res.append((i, l, resl))
-
-    logger.debug(f"{len(Res)} computations finished")
-    if len(Res)>0 and type(Res[0][-1])==bool:
-       logger.debug(f"{len([m for m in Res if m[-1]])} results with output True")
-
-    return Res
+            return timeout_process(is_fiber_singleton_reorder, (ineq, V, method), timeout=lim)
+    except TimeOutException:
+        from .utils import getLogger
+        getLogger("groebner.is_fiber_singleton_with_timeout").debug(
+            f"{ineq} did not complete in {lim} seconds"
+        )
+        return None
+    
 
 def Grobner_List_Test(
         Liste: Iterable[Inequality],
         lim: float,
         V: Representation,
-        method: Method
+        method: Method,
+        confirm: bool = False,
     ) -> tuple[list[Inequality], list[Inequality]]:
-    # FIXME: les éléments de Grobner_res sont de simples bool, et non des listes
-    Grobner_Res = long_calculation(Liste, is_fiber_singleton_reorder, lim, [V,method])
-    Grobner_True = [l for i, l, resl in Grobner_Res if resl]
-    Grobner_Inconclusive = [l for i, l, resl in Grobner_Res if resl is None]
+    """
+    Returns the inequalities whose fiber is a single point and those whose computation exceeds lim seconds
+
+    The inequalities are checked in parallel (see `Parallel`), each within the time limit
+    (see `is_fiber_singleton_with_timeout`).
 
-    from .utils import getLogger
+    With the modular method, the Gröbner bases are computed over GF(p). If confirm is True,
+    the negative answers are then checked again over QQ[I] (probabilistic method) since
+    an unlucky prime may change the degrees of the basis (an inconclusive confirmation
+    keeps the modular answer).
+    """
+    from .parallel import Parallel
+    from .utils import getLogger, PartialFunction
     logger = getLogger("groebner.Grobner_List_Test")
+
+    def check(inequalities: list[Inequality], method: Method) -> tuple[list[Inequality], list[Inequality], list[Inequality]]:
+        results = Parallel().executor.map(
+            PartialFunction(is_fiber_singleton_with_timeout, V, method, lim),
+            inequalities,
+            unordered=False,
+        )
+        validated: list[Inequality] = []
+        rejected: list[Inequality] = []
+        inconclusive: list[Inequality] = []
+        for ineq, result in zip(inequalities, results):
+            if result is None:
+                inconclusive.append(ineq)
+            elif result:
+                validated.append(ineq)
+            else:
+                rejected.append(ineq)
+        return validated, rejected, inconclusive
+
+    Grobner_True, Grobner_False, Grobner_Inconclusive = check(list(Liste), method)
+
+    if method == "modular" and confirm and Grobner_False:
+        Grobner_Fixed, _, _ = check(Grobner_False, "probabilistic")
+        logger.debug(f"{len(Grobner_Fixed)} negative answers of the modular method invalidated over QQ[I]")
+        Grobner_True += Grobner_Fixed
     logger.debug(f"{len(Grobner_True)} true inequalities found by Grobner method, {len(Grobner_Inconclusive)} inconclusive inequalities")
     return Grobner_True, Grobner_Inconclusive
 
@@ -17,8 +17,10 @@ from .rings import QQ, vector, Vector
 class Inequality:
     """
     An inequality composed of a Tau and a list of permutations, one from each block of Tau.
-    The list of permutation can be given as a list of permutations (w), as a list of inversions (inversions) 
-    or as a dictionnary weight -> list of inversions. 
+    The list of permutation can be given as a list of permutations (w), as a list of inversions (inversions),
+    as a dictionnary weight -> list of inversions or as a bitmask of the inversions (see `Root.mask_of_U`).
+
+    The bitmask is the compact form used for serialization, hashing and comparison.
 
     In wtau, the blocks are permuted by the **inverse** of the corresponding permutation.
     
@@ -41,10 +43,11 @@ class Inequality:
         tau: Tau, 
         w: Optional[Sequence[Permutation]] = None,
         inversions: Optional[Sequence[Root]] = None,
-        gr_inversions: Optional[dict[int, list[Root]]] = None
+        gr_inversions: Optional[dict[int, list[Root]]] = None,
+        inversions_mask: Optional[int] = None,
     ):
-        if w is None and inversions is None and gr_inversions is None :
-            raise ValueError("At least one of w, inversions or gr_inversions, should be defined")
+        if w is None and inversions is None and gr_inversions is None and inversions_mask is None:
+            raise ValueError("At least one of w, inversions, gr_inversions or inversions_mask, should be defined")
         assert w is None or len(tau.G) == len(list(w))
             
         self.tau = tau
@@ -54,14 +57,16 @@ class Inequality:
             self.inversions = tuple(inversions)
         if gr_inversions is not None:
             self.gr_inversions = gr_inversions
+        if inversions_mask is not None:
+            self.inversions_mask = inversions_mask
     
-    def __getstate__(self) -> tuple[Tau, tuple[Permutation, ...]]:
+    def __getstate__(self) -> tuple[Tau, int]:
         """ Minimal state that reproduce the instance (for serialization) """
-        return self.tau, self.w
+        return self.tau, self.inversions_mask
     
-    def __setstate__(self, state: tuple[Tau, tuple[Permutation, ...]]) -> None:
+    def __setstate__(self, state: tuple[Tau, int]) -> None:
         """ Restoring instance from it's serialization state """
-        self.tau, self.w = state
+        self.tau, self.inversions_mask = state
 
     @cached_property
     def wtau(self) -> Tau:
@@ -82,6 +87,9 @@ class Inequality:
         if "gr_inversions" in self.__dict__:
             # Compute from gr_inversions
             return tuple(itertools.chain.from_iterable(self.gr_inversions.values()))
+        elif "inversions_mask" in self.__dict__ and "w" not in self.__dict__:
+            # Compute from the bitmask
+            return Root.from_mask_of_U(self.inversions_mask, self.tau.G)
         else:
             # Compute from w
             return self.__compute_inversions_from_w()
@@ -93,6 +101,37 @@ class Inequality:
         """
         return self.tau.grading_roots_in(self.inversions) 
 
+    @cached_property
+    def inversions_mask(self) -> int:
+        """
+        Bitmask of the inversions over the indices of `Root.all_of_U` (see `Root.mask_of_U`).
+
+        >>> from moment_cone import *
+        >>> G = LinearGroup((2, 2, 2, 3, 1))
+        >>> tau = Tau.from_flatten([6, 2, 1, 4, 1, 4, 5, 3, 1, 1], G)
+        >>> w = Permutation((0, 1)), Permutation((1, 0)), Permutation((0, 1)), Permutation((2, 0, 1)),Permutation((0,))
+        >>> ineq = Inequality(tau, w=w)
+        >>> bin(ineq.inversions_mask)
+        '0b11010'
+        >>> Inequality(tau, inversions_mask=ineq.inversions_mask) == ineq
+        True
+        """
+        return Root.mask_of_U(self.inversions, self.tau.G)
+
+    @cached_property
+    def gr_inversions_mask(self) -> dict[int, int]:
+        """
+        Same as `gr_inversions` but with each list of inversions encoded as a bitmask.
+
+        Use `Root.indices_from_mask` to get the corresponding indices in `Root.all_of_U`.
+        """
+        mask = self.inversions_mask
+        return {
+            x: gr_mask & mask
+            for x, gr_mask in self.tau.grading_rootsU_mask.items()
+            if gr_mask & mask
+        }
+
     def __compute_w(self) -> tuple[Permutation, ...]:
         """
         Compute w from the inversions.
@@ -189,11 +228,11 @@ class Inequality:
     def __eq__(self, other: Any) -> bool:
         if not isinstance(other, Inequality):
             return NotImplemented
-        return self.tau == other.tau and self.w == other.w
+        return self.inversions_mask == other.inversions_mask and self.tau == other.tau
     
     def __hash__(self) -> int:
         """ Hash consistent with equality so that to be safely used in a set or a dict """
-        return hash((self.tau, self.w))
+        return hash((self.tau, self.inversions_mask))
     
     @cached_property
     def sort_mod_sym_dim(self) -> "Inequality":
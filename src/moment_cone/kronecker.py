@@ -8,12 +8,16 @@ __all__ = (
     "KroneckerCoefficient",
     "KroneckerCoefficientCache",
     "KroneckerCoefficientMLCache",
+    "KroneckerCoefficientDBCache",
+    "KroneckerCoefficientCharacterTable",
+    "convert_cache_to_db",
 )
 
 from sage.all import SymmetricFunctions, QQ # type: ignore
 
 from .typing import *
 from .partition import Partition
+from .utils import LRUCache
 
 
 # Symmetric Functions over Rational Field in the Schur basis
@@ -141,6 +145,9 @@ class KroneckerCoefficientCache(KroneckerCoefficient):
     """
     Kronecker coefficient computation using cache to store the computed decompositions
 
+    The size of the cache can be limited to maxsize decompositions, the least
+    recently used ones being evicted first.
+
     >>> kc = KroneckerCoefficientCache()
     >>> print(kc)
     KroneckerCoefficientCache(#cache=0 (), #hit=0, #miss=0)
@@ -165,28 +172,42 @@ class KroneckerCoefficientCache(KroneckerCoefficient):
     1
     >>> kc((partitions[0], partitions[0]))
     1
+
+    >>> kc = KroneckerCoefficientCache(maxsize=1)
+    >>> kc(partitions), kc(partitions[:3]), kc(partitions)
+    (1607, 1, 1607)
+    >>> print(kc)
+    KroneckerCoefficientCache(#cache=1 (#4=1), #hit=0, #miss=3, #eviction=2)
     """
-    _cache: dict[tuple[Partition, ...], dict[Partition, int]]
-    _hit: int
-    _miss: int
+    _cache: LRUCache[tuple[Partition, ...], dict[Partition, int]]
 
-    def __init__(self, file_prefix: Optional[str] = None):
+    def __init__(self, file_prefix: Optional[str] = None, maxsize: Optional[int] = None):
         super().__init__()
-        self._cache = dict()
-        self._hit = 0
-        self._miss = 0
+        self._cache = LRUCache(maxsize)
 
         if file_prefix is not None:
             self.load_cache(file_prefix)
 
+    @property
+    def hits(self) -> int:
+        """ Number of decompositions found in the cache """
+        return self._cache.hits
+
+    @property
+    def misses(self) -> int:
+        """ Number of computed decompositions """
+        return self._cache.misses
+
+    @property
+    def evictions(self) -> int:
+        """ Number of decompositions evicted from the cache """
+        return self._cache.evictions
+
     def _product(self, partitions: Sequence[Partition]) -> dict[Partition, int]:
         partitions = tuple(partitions)
         try:
-            product = self._cache[partitions]
-            self._hit += 1
-            return product
+            return self._cache[partitions]
         except KeyError:
-            self._miss += 1
             product = kronecker_product(partitions)
             self._cache[partitions] = product
             return product
@@ -195,16 +216,17 @@ class KroneckerCoefficientCache(KroneckerCoefficient):
         from .utils import group_by_block
         cache_details = group_by_block(sorted(len(key) for key in self._cache.keys()))
         cache_details_str = ",".join(f"#{n}={c}" for n, c in cache_details)
+        evictions_str = "" if self._cache.maxsize is None else f", #eviction={self.evictions}"
         return (
             f"{type(self).__name__}("
-            f"#cache={len(self._cache)} ({cache_details_str}), #hit={self._hit}, #miss={self._miss}"
+            f"#cache={len(self._cache)} ({cache_details_str}), #hit={self.hits}, #miss={self.misses}{evictions_str}"
             ")"
         )
     
     def load_cache(self, file_prefix: str, clear: bool = False) -> None:
         """ Load cache from given filename prefix (will append .pkl.xz) """
         if clear:
-            self._cache = dict()
+            self._cache.clear()
 
         import lzma, pickle, re
         file_name = file_prefix + ".pkl.xz"
@@ -217,11 +239,37 @@ class KroneckerCoefficientCache(KroneckerCoefficient):
             with lzma.open(file_name, "rb") as fh:
                 self._cache.update(pickle.load(fh))
 
+    def cache_items(self) -> Iterable[tuple[tuple[Partition, ...], dict[Partition, int]]]:
+        """ Decompositions currently known by the cache """
+        return self._cache.items()
+
     def save_cache(self, file_prefix: str) -> None:
         """ Save cache in given filename prefix (will append .pkl.xz) """
         import lzma, pickle
         with lzma.open(file_prefix + ".pkl.xz", "wb") as fh:
-            pickle.dump(self._cache, fh)
+            pickle.dump(dict(self.cache_items()), fh)
+
+    def merge_cache(self, file_prefix: str) -> int:
+        """
+        Merge the cache into the one saved in given filename prefix (will append .pkl.xz)
+
+        The file is created if it doesn't exist and is replaced atomically.
+        Returns the number of decompositions added to the file.
+        """
+        import lzma, os, pickle
+        file_name = file_prefix + ".pkl.xz"
+        cache: dict[tuple[Partition, ...], dict[Partition, int]] = dict()
+        if os.path.exists(file_name):
+            with lzma.open(file_name, "rb") as fh:
+                cache = pickle.load(fh)
+        previous_size = len(cache)
+        cache.update(self.cache_items())
+
+        tmp_name = f"{file_name}.{os.getpid()}.tmp"
+        with lzma.open(tmp_name, "wb") as fh:
+            pickle.dump(cache, fh)
+        os.replace(tmp_name, file_name)
+        return len(cache) - previous_size
 
 
 class KroneckerCoefficientMLCache(KroneckerCoefficientCache):
@@ -269,11 +317,8 @@ class KroneckerCoefficientMLCache(KroneckerCoefficientCache):
         result: dict[Partition, int]
 
         try:
-            result = self._cache[partitions]
-            self._hit += 1
-            return result
+            return self._cache[partitions]
         except KeyError:
-            self._miss += 1
             head: Any
             tail: Any
             if len(partitions) == 2:
@@ -326,3 +371,205 @@ class KroneckerCoefficientMLCache(KroneckerCoefficientCache):
         head = self._product(partitions[:head_length])
         tail = self._product(partitions[head_length:])
         return sum(head[m] * tail[m] for m in head.keys() & tail.keys())    
+
+
+class KroneckerCoefficientDBCache(KroneckerCoefficientMLCache):
+    """
+    Multi-level cache backed by a persistent sqlite database
+
+    The decompositions are looked up lazily in the database when they are not
+    already in memory, and the newly computed ones are written as soon as they
+    are available, so that the work is not lost if the run crashes.
+
+    The database is opened in WAL mode so that it can be read by concurrent
+    processes (e.g. parallel workers or other runs) while being updated.
+    It is thus a store shared by the parallel workers: only the database is
+    transferred when the cache is sent to another process, not the in-memory
+    level. A temporary database is removed when the cache is closed.
+
+    >>> import tempfile, os
+    >>> db_dir = tempfile.TemporaryDirectory()
+    >>> file_name = os.path.join(db_dir.name, "kronecker.sqlite")
+    >>> partitions = (3, 1, 1, 1, 1, 1), (4, 3, 1), (2, 2, 2, 2), (5, 1, 1, 1), (4, 2, 1,1)
+    >>> partitions = tuple(Partition(p) for p in partitions)
+    >>> kc = KroneckerCoefficientDBCache(file_name)
+    >>> kc(partitions)
+    1607
+    >>> print(kc)
+    KroneckerCoefficientDBCache(#cache=3 (#2=2,#3=1), #hit=0, #miss=3, #db=3)
+
+    >>> kc = KroneckerCoefficientDBCache(file_name)
+    >>> kc(partitions)
+    1607
+    >>> print(kc)
+    KroneckerCoefficientDBCache(#cache=2 (#2=1,#3=1), #hit=2, #miss=0, #db=3)
+    >>> kc.close()
+    >>> db_dir.cleanup()
+    """
+    file_name: str
+    temporary: bool
+    _connection: Any
+    _pid: Optional[int]
+
+    def __init__(self,
+                 file_name: str,
+                 file_prefix: Optional[str] = None,
+                 maxsize: Optional[int] = None,
+                 temporary: bool = False):
+        self.file_name = file_name
+        self.temporary = temporary
+        self._connection = None
+        self._pid = None
+        super().__init__(file_prefix, maxsize)
+
+    @property
+    def connection(self) -> Any:
+        """ Connection to the database, (re)opened lazily in each process """
+        import os, sqlite3
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = sqlite3.connect(self.file_name, timeout=60)
+            self._pid = os.getpid()
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS products (key TEXT PRIMARY KEY, value BLOB NOT NULL)"
+            )
+            self._connection.commit()
+        return self._connection
+
+    @staticmethod
+    def _key(partitions: Sequence[Partition]) -> str:
+        """ Database key of a sequence of partitions """
+        return "|".join(",".join(map(str, p)) for p in partitions)
+
+    def _db_get(self, partitions: Sequence[Partition]) -> Optional[dict[Partition, int]]:
+        """ Decomposition stored in the database (None if not found) """
+        import pickle
+        row = self.connection.execute(
+            "SELECT value FROM products WHERE key = ?", (self._key(partitions),)
+        ).fetchone()
+        if row is None:
+            return None
+        return {Partition(p): c for p, c in pickle.loads(row[0])}
+
+    def _db_put(self, items: Iterable[tuple[Sequence[Partition], dict[Partition, int]]]) -> None:
+        """ Store decompositions in the database (existing ones are kept) """
+        import pickle
+        with self.connection as connection:
+            connection.executemany(
+                "INSERT OR IGNORE INTO products (key, value) VALUES (?, ?)",
+                (
+                    (self._key(partitions), pickle.dumps([(tuple(p), c) for p, c in product.items()]))
+                    for partitions, product in items
+                ),
+            )
+
+    @property
+    def db_size(self) -> int:
+        """ Number of decompositions stored in the database """
+        return int(self.connection.execute("SELECT COUNT(*) FROM products").fetchone()[0])
+
+    def _product(self, partitions: Sequence[Partition]) -> dict[Partition, int]:
+        partitions = tuple(partitions)
+        is_new = False
+        if partitions not in self._cache:
+            stored = self._db_get(partitions)
+            if stored is None:
+                is_new = True
+            else:
+                self._cache[partitions] = stored
+
+        product = super()._product(partitions)
+        if is_new:
+            self._db_put(((partitions, product),))
+        return product
+
+    def cache_items(self) -> Iterable[tuple[tuple[Partition, ...], dict[Partition, int]]]:
+        """ Decompositions stored in the database """
+        import pickle
+        for key, value in self.connection.execute("SELECT key, value FROM products"):
+            yield (
+                tuple(Partition(map(int, filter(None, p.split(",")))) for p in key.split("|")),
+                {Partition(p): c for p, c in pickle.loads(value)},
+            )
+
+    def close(self) -> None:
+        """ Close the connection to the database (and remove it if temporary) """
+        import os
+        if self._connection is not None and self._pid is not None:
+            if self._pid == os.getpid():
+                self._connection.close()
+        self._connection = None
+        self._pid = None
+
+        if self.temporary:
+            for suffix in ("", "-wal", "-shm"):
+                try:
+                    os.remove(self.file_name + suffix)
+                except FileNotFoundError:
+                    pass
+
+    def __getstate__(self) -> dict[str, Any]:
+        """
+        The connection is not serialized (it will be reopened by the other process)
+        and neither is the in-memory level since the database is shared.
+        """
+        state = self.__dict__.copy()
+        state["_connection"] = None
+        state["_pid"] = None
+        state["_cache"] = LRUCache(self._cache.maxsize)
+        return state
+
+    def __repr__(self) -> str:
+        return super().__repr__()[:-1] + f", #db={self.db_size})"
+
+
+class KroneckerCoefficientCharacterTable(KroneckerCoefficient):
+    """
+    Kronecker coefficient computation from the character table of the symmetric group
+
+    It doesn't rely on Sage: the character tables are computed once per n
+    (and optionally saved in cache_dir) and the coefficients are then obtained
+    by integer vector and matrix products (see `moment_cone.character_table`).
+
+    >>> kc = KroneckerCoefficientCharacterTable()
+    >>> partitions = (3, 1, 1, 1, 1, 1), (4, 3, 1), (2, 2, 2, 2), (5, 1, 1, 1), (4, 2, 1,1)
+    >>> partitions = tuple(Partition(p) for p in partitions)
+    >>> kc(partitions)
+    1607
+    >>> kc(partitions[:3])
+    1
+    >>> kc(partitions[:2])
+    0
+    """
+    cache_dir: Optional[str]
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        super().__init__()
+        self.cache_dir = cache_dir
+
+    def _product(self, partitions: Sequence[Partition]) -> dict[Partition, int]:
+        from .character_table import kronecker_from_characters
+        return cast(dict[Partition, int], kronecker_from_characters(partitions, cache_dir=self.cache_dir))
+
+    def _kernel(self, partitions: Sequence[Partition]) -> int:
+        from .character_table import kronecker_from_characters
+        return cast(int, kronecker_from_characters(partitions[:-1], partitions[-1], cache_dir=self.cache_dir))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(cache_dir={self.cache_dir!r})"
+
+
+def convert_cache_to_db(file_prefix: str, file_name: str) -> int:
+    """
+    Import a cache saved by `KroneckerCoefficientCache.save_cache` (.pkl.xz)
+    into a database usable by `KroneckerCoefficientDBCache`
+
+    Returns the number of decompositions in the database.
+    """
+    cache = KroneckerCoefficientCache(file_prefix)
+    db = KroneckerCoefficientDBCache(file_name)
+    db._db_put(cache._cache.items())
+    count = db.db_size
+    db.close()
+    return count
@@ -8,6 +8,8 @@ from .utils import symmetries
 from .typing import *
 
 if TYPE_CHECKING:
+    import numpy as np
+    from numpy.typing import NDArray
     from .rings import Ring, PolynomialRingForWeights
 
 class LinearGroup(tuple[int, ...]):
@@ -63,6 +65,51 @@ class LinearGroup(tuple[int, ...]):
         g = sum(i**2 for i in self)
         return (self.dim - self.rank) // 2
 
+    @cached_property
+    def U_index_table(self) -> "NDArray[np.intp]":
+        """
+        Lookup table (k, i, j) -> index of Root(k, i, j) in `Root.all_of_U`
+
+        Entries that don't correspond to a root of U are set to -1.
+
+        >>> G = LinearGroup((2, 3))
+        >>> G.U_index_table[1]
+        array([[-1,  1,  2],
+               [-1, -1,  3],
+               [-1, -1, -1]])
+        """
+        import numpy as np
+        table = np.full((len(self), max(self, default=0), max(self, default=0)), -1, dtype=np.intp)
+        idx = 0
+        for k, dk in enumerate(self):
+            for i in range(dk):
+                table[k, i, i + 1:dk] = np.arange(idx, idx + dk - i - 1)
+                idx += dk - i - 1
+        table.flags.writeable = False
+        return table
+
+    @cached_property
+    def K_index_table(self) -> "NDArray[np.intp]":
+        """
+        Lookup table (k, i, j) -> index of Root(k, i, j) in `Root.all_of_K`
+
+        Entries outside of the dimensions are set to -1.
+
+        >>> G = LinearGroup((2, 3))
+        >>> G.K_index_table[0]
+        array([[ 0,  1, -1],
+               [ 2,  3, -1],
+               [-1, -1, -1]])
+        """
+        import numpy as np
+        table = np.full((len(self), max(self, default=0), max(self, default=0)), -1, dtype=np.intp)
+        idx = 0
+        for k, dk in enumerate(self):
+            table[k, :dk, :dk] = np.arange(idx, idx + dk**2).reshape(dk, dk)
+            idx += dk**2
+        table.flags.writeable = False
+        return table
+
     def u_max(self, Gred: "LinearGroup") -> int:
         """
         Maximal value of u obtained by extending a e-1-PS to a d-1-PS
@@ -102,4 +149,11 @@ class LinearGroup(tuple[int, ...]):
     @cached_property
     def QU_Q(self) -> "PolynomialRingForWeights":
         return self.QU()
+
+    @cached_property
+    def QU_Fp(self) -> "PolynomialRingForWeights":
+        """ Polynomial ring of U over GF(p) used by the modular method (p = MODULAR_PRIME) """
+        from sage.all import GF # type: ignore
+        from .modular import MODULAR_PRIME
+        return self.QU(GF(MODULAR_PRIME))
         
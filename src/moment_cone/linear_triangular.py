@@ -1,4 +1,6 @@
 import itertools
+import numpy as np
+from numpy.typing import NDArray
 
 from sage.all import  identity_matrix # type: ignore
 
@@ -8,10 +10,12 @@ from .tau import *
 from .representation import *
 
        
-def is_linear_triangular(V: Representation, tau: Tau, Invs: list[Root]) -> bool:
+def is_linear_triangular_dense(V: Representation, tau: Tau, Invs: list[Root]) -> bool:
     """
     Check if a given list of equalities is Linear Trinagular or not.
     Each equality is actually given by its list of monomials (without coefficients)
+
+    Reference implementation using the inverse of a dense matrix (see `is_linear_triangular`)
     """
     from .rings import QQ
 
@@ -50,4 +54,68 @@ def is_linear_triangular(V: Representation, tau: Tau, Invs: list[Root]) -> bool:
     
     NInv=[alpha for alpha in Invs if alpha not in LInv]
     
+    return(is_linear_triangular_dense(V,tau, NInv))
+
+
+def long_path_counts(target: int, sources: NDArray[np.int64], targets: NDArray[np.int64], dim: int) -> NDArray[np.int64]:
+    """
+    Number of paths of length at least 2 from each vertex to the target, saturated at 2
+
+    The graph (given by its edges sources -> targets) must be acyclic, as the graph of
+    a nilpotent matrix. It is the column target of sum_{k >= 2} MG^k, computed
+    by propagating the paths backward from the target.
+    """
+    current = np.bincount(sources[targets == target], minlength=dim) # Paths of length 1
+    total = np.zeros(dim, dtype=np.int64)
+    for _ in range(dim):
+        current = np.minimum(np.bincount(sources, weights=current[targets], minlength=dim), 2).astype(np.int64)
+        if not current.any():
+            break
+        total += current
+    return np.minimum(total, 2)
+
+
+def is_linear_triangular(V: Representation, tau: Tau, Invs: list[Root]) -> bool:
+    """
+    Check if a given list of equalities is Linear Trinagular or not.
+    Each equality is actually given by its list of monomials (without coefficients)
+
+    Since the matrix MG of the graph is nilpotent, the entries of (In - MG)^(-1) - In - MG
+    are the numbers of paths of length at least 2 in the graph: they are computed
+    (up to 2, only the entries at most 1 matter) by a sparse propagation along the edges
+    instead of inverting a dense matrix (see `is_linear_triangular_dense`).
+    """
+    if Invs==[] :
+        return(True)
+    sources, targets = V.graph_edges(Invs) # Assembled from the cached edges of each root
+    listnp: list[Weight] = []
+    for ll in list(tau.non_positive_weights(V).values()):
+        listnp+=ll    
+    Indices_neg_weights=np.array([V.index_of_weight(chi) for chi in listnp], dtype=np.int64)
+    is_neg_weight = np.zeros(V.dim, dtype=bool)
+    is_neg_weight[Indices_neg_weights] = True
+    nb_lin_eq=0
+    listp: list[Weight] = []
+    for ll in list(tau.positive_weights(V).values()):
+        listp+=ll
+    shifts=[sum(V.G[:i]) for i in range(len(V.G)+1)]
+
+    LInv=set()
+    for chi in listp:
+        id_chi = V.index_of_weight(chi)
+        if np.all(long_path_counts(id_chi, sources, targets, V.dim)[Indices_neg_weights] <= 1) : # the equation associated to chi is linear
+            nb_lin_eq+=1
+            for j in np.unique(sources[(targets == id_chi) & is_neg_weight[sources]]):
+                chi2 = V.all_weights[j]
+                alpha=chi2.as_vector-chi.as_vector
+                i,j=[k for k in range(len(alpha)) if alpha[k] != 0][:2]
+                k=0
+                while shifts[k]<=i: k+=1
+                LInv.add(Root(k-1,i-shifts[k-1],j-shifts[k-1])) 
+    
+    if len(LInv) != nb_lin_eq or LInv==set():
+        return(False)
+    
+    NInv=[alpha for alpha in Invs if alpha not in LInv]
+    
     return(is_linear_triangular(V,tau, NInv))
@@ -2,6 +2,7 @@ __all__ = (
     #"ListW_Mod",
     "List_Inv_Ws_Mod",
     "Check_Rank_Tpi",
+    "Check_Rank_Tpi_batch",
 )
 
 import numpy as np
@@ -248,11 +249,27 @@ def inversion_set_to_permutation(
     return Permutation(w)
 
 
-def Check_Rank_Tpi(ineq : Inequality, V: Representation, method: Method) -> bool:
+def Check_Rank_Tpi(
+        ineq : Inequality,
+        V: Representation,
+        method: Method,
+        block_cache: Optional[dict[tuple[int, int], bool]] = None,
+    ) -> bool:
     """
     Check if Tpi is inversible at a general point of V^\tau. 
     General means randon if the method is probabilist and formal if the method is symbolic.
     The matrix being block trinagular, the function check successively the diagonal blocks.
+
+    With the modular method, the random point of the probabilistic method is reduced
+    in GF(p) with p ≡ 1 mod 4 (see `moment_cone.modular`), the tensor being stored
+    as residues, and the ranks are computed over GF(p).
+    In addition to the false rejections of the probabilistic method (random point in a
+    proper Zariski-closed subset), a block of full rank over QQ[I] may be deficient
+    modulo p with a probability of order 1/p (about 5e-10 for the default prime).
+
+    If given, block_cache memoizes the verdict of each diagonal block, keyed by the value x
+    and the bitmask of gr[x]. It must be shared only between inequalities with the same tau
+    (see `Check_Rank_Tpi_batch`).
     """
     tau = ineq.tau
     G = tau.G 
@@ -261,19 +278,32 @@ def Check_Rank_Tpi(ineq : Inequality, V: Representation, method: Method) -> bool
         ring = V.QI
     elif method == "symbolic":
         ring = V.QV
+    elif method == "modular":
+        from .modular import rank_mod_p
     else:
         raise ValueError(f"Invalid value {method} of the computation method")
     
     gw = tau.grading_weights(V)
-    chi_Vtau_idx=[V.index_of_weight(chi) for chi in gw[0]]
-    gr = ineq.gr_inversions
+    chi_Vtau_idx=V.indices_of_weights(gw[0])
+    gr = ineq.gr_inversions_mask
+    if block_cache is not None and any(block_cache.get(block) is False for block in gr.items()):
+        return False # Sharing a block already known to be singular
+    
     rank_M: int
     for x in sorted(gr.keys(),reverse=True): # Run over the possible values of tau.scalar(root) for root inversion of w
-        gr_idx=[a.index_in_all_of_U(G) for a in gr[x]]
-        gw_idx=[V.index_of_weight(chi) for chi in gw[x]]
-        if method == "probabilistic" :
+        if block_cache is not None and (x, gr[x]) in block_cache:
+            continue # Block already known to be invertible
+        gr_idx=Root.indices_from_mask(gr[x])
+        gw_idx=V.indices_of_weights(gw[x])
+        if method == "modular":
+            for p in range(V.random_deep):
+                Mn = V.T_Pi_3D("modular", "imaginary")[np.ix_([p], chi_Vtau_idx, gw_idx, gr_idx)].sum(axis=1)
+                rank_M = rank_mod_p(Mn[0])
+                if rank_M == len(gr_idx):
+                    break
+        elif method == "probabilistic":
             for p in range(V.random_deep):
-                Mn = V.T_Pi_3D(method, "imaginary")[np.ix_([2*p, 2*p+1], chi_Vtau_idx, gw_idx, gr_idx)].sum(axis=1)
+                Mn = V.T_Pi_3D("probabilistic", "imaginary")[np.ix_([2*p, 2*p+1], chi_Vtau_idx, gw_idx, gr_idx)].sum(axis=1)
                 M = matrix(
                     len(gr_idx),
                     len(gr_idx),
@@ -287,10 +317,24 @@ def Check_Rank_Tpi(ineq : Inequality, V: Representation, method: Method) -> bool
             M = matrix(ring,Mn)
             rank_M = M.rank()
         
+        if block_cache is not None:
+            block_cache[x, gr[x]] = rank_M == len(gr_idx)
         if rank_M < len(gr_idx):
                return False
     return True       
 
 
+def Check_Rank_Tpi_batch(ineqs: Sequence[Inequality], V: Representation, method: Method) -> list[bool]:
+    """
+    Check_Rank_Tpi for a batch of inequalities sharing the same tau
+
+    The rank of each diagonal block is computed only once for the whole batch
+    and the inequalities sharing a singular block are rejected without further computation.
+    """
+    assert all(ineq.tau == ineqs[0].tau for ineq in ineqs[1:]), "All inequalities must share the same tau"
+    block_cache: dict[tuple[int, int], bool] = {}
+    return [Check_Rank_Tpi(ineq, V, method, block_cache) for ineq in ineqs]
+
+
 
     
@@ -25,12 +25,13 @@ import typing
 from tqdm.auto import tqdm
 
 from .typing import *
-from .representation import Representation
+from .representation import Representation, PointwiseTensor
 from .linear_group import LinearGroup
 from .tau import Tau
 from .inequality import Inequality
+from .partition import Partition
 from .root import Root
-from .kronecker import KroneckerCoefficient, KroneckerCoefficientMLCache
+from .kronecker import KroneckerCoefficient, KroneckerCoefficientCache, KroneckerCoefficientMLCache
 from .bkr import PlethysmCache
 from .utils import to_literal
 from .export import ExportFormat
@@ -534,8 +535,13 @@ class StabilizerConditionStep(FilterStep[Tau]):
         if  tau.is_dom_reg :
             return True
         else: 
-            ListK=[beta.index_in_all_of_K(V.G) for beta in tau.orthogonal_rootsB]+[beta.opposite.index_in_all_of_K(V.G) for beta in tau.orthogonal_rootsU]
-            ListChi=[V.index_of_weight(chi) for chi in tau.orthogonal_weights(V)]+[V.dim+V.index_of_weight(chi) for chi in tau.orthogonal_weights(V)]
+            import numpy as np
+            ListK=np.concatenate((
+                Root.indices_in_all_of_K(tau.orthogonal_rootsB, V.G),
+                Root.indices_in_all_of_K((beta.opposite for beta in tau.orthogonal_rootsU), V.G),
+            ))
+            zw_idx=V.indices_of_weights(tau.orthogonal_weights(V))
+            ListChi=np.concatenate((zw_idx, V.dim + zw_idx))
             return dim_gen_stab_of_K(Ms,ListK,ListChi) == V.G.rank - V.dim_cone + 1
         
     def apply(self, tau_dataset: Dataset[Tau]) -> Dataset[Tau]:
@@ -596,11 +602,85 @@ class TPiPreComputationStep(FilterStep[Inequality]):
     Pre-computing the Representation.TPi3D matrix used in PiDominancy
     and Birationality steps.
 
+    Only the variants needed by the given filters and methods are built, and only
+    for the first random point for the probabilistic ones.
+
     It thus filter nothing.
     """
+    filters: list[str]
+    tpi_method: Method
+    ram_schub_method: Method
+    ram0_method: Method
+
+    def __init__(
+            self,
+            V: Representation,
+            filters: Iterable[str] = ("PiDominancy", "Birationality"),
+            tpi_method: Method = "probabilistic",
+            ram_schub_method: Method = "probabilistic",
+            ram0_method: Method = "probabilistic",
+            **kwargs: Any):
+        super().__init__(V, **kwargs)
+        self.filters = list(filters)
+        self.tpi_method = tpi_method
+        self.ram_schub_method = ram_schub_method
+        self.ram0_method = ram0_method
+
+    @staticmethod
+    def required_variants(
+            filters: Iterable[str],
+            tpi_method: Method = "probabilistic",
+            ram_schub_method: Method = "probabilistic",
+            ram0_method: Method = "probabilistic",
+        ) -> set[tuple[Method, Optional[str]]]:
+        """
+        Variants (method, kind) of T_Pi_3D used by the given filters
+
+        The symbolic tensor used by the rare Taylor expansion of the R_0 check is
+        left to be built on first access:
+
+        >>> sorted(TPiPreComputationStep.required_variants(["PiDominancy"], "modular"))
+        [('modular', 'imaginary')]
+        >>> sorted(TPiPreComputationStep.required_variants(["PiDominancy", "Birationality"]))
+        [('probabilistic', 'imaginary'), ('probabilistic', 'line'), ('symbolic_int', None)]
+        """
+        def imaginary(method: Method) -> tuple[Method, Optional[str]]:
+            # The modular method uses the residues of the probabilistic variant
+            return (method if method in ("symbolic", "modular") else "probabilistic", "imaginary")
+
+        filters = set(filters)
+        variants: set[tuple[Method, Optional[str]]] = set()
+        if "PiDominancy" in filters:
+            variants.add(imaginary(tpi_method))
+        if "Birationality" in filters:
+            variants.add(imaginary(ram_schub_method))
+            variants.add(("symbolic" if ram0_method == "symbolic" else "probabilistic", "line"))
+            variants.add(("symbolic_int", None))
+        return variants
+
     def apply(self, dataset: Dataset[T]) -> Dataset[T]:
-        self.V.T_Pi_3D
+        for method, kind in self.required_variants(
+                self.filters,
+                self.tpi_method,
+                self.ram_schub_method,
+                self.ram0_method):
+            tensor = self.V.T_Pi_3D(method, kind) # type: ignore
+            if isinstance(tensor, PointwiseTensor):
+                # The next random points are built on demand by the checks
+                tensor.point(0)
         return dataset
+
+    @classmethod
+    def from_config(cls: type[Self], V: Representation, config: Namespace, **kwargs: Any) -> "TPiPreComputationStep":
+        """ Build a step from the representation and the command-line arguments """
+        return super().from_config(
+            V=V,
+            config=config,
+            tpi_method=config.tpi_method,
+            ram_schub_method=config.ram_schub_method,
+            ram0_method=config.ram0_method,
+            **kwargs
+        )
     
 
 ###############################################################################
@@ -611,12 +691,34 @@ class PiDominancyStep(FilterStep[Inequality]):
     It only reject pending inequalities and doesn't modified the validated ones.
 
     With the probabilistic method, valid inequalities may be rejected (with a low probability).
+    The modular method computes the same ranks over a finite field instead of QQ[I]: it is faster
+    and adds a false rejection probability of order 1/p per block (see `Check_Rank_Tpi`).
+
+    In batch mode, consecutive inequalities with the same tau are checked in a same task
+    so that the ranks of the blocks they share are computed only once.
     """
     tpi_method: Method
+    tpi_batch: bool
 
-    def __init__(self, V: Representation, tpi_method: Method = "probabilistic", **kwargs: Any):
+    def __init__(
+            self,
+            V: Representation,
+            tpi_method: Method = "probabilistic",
+            tpi_batch: bool = False,
+            **kwargs: Any):
         super().__init__(V, **kwargs)
         self.tpi_method = tpi_method
+        self.tpi_batch = tpi_batch
+
+    @staticmethod
+    def filter_batch(ineqs: list[Inequality], V: Representation, tpi_method: Method) -> list[Inequality]:
+        """ Helper method that returns the inequalities of a same tau that pass the check """
+        from .list_of_W import Check_Rank_Tpi_batch
+        return [
+            ineq
+            for ineq, keep in zip(ineqs, Check_Rank_Tpi_batch(ineqs, V, tpi_method))
+            if keep
+        ]
 
     def apply(self, ineq_dataset: Dataset[Inequality]) -> Dataset[Inequality]:
         from .list_of_W import Check_Rank_Tpi
@@ -624,11 +726,25 @@ class PiDominancyStep(FilterStep[Inequality]):
         from .utils import PartialFunction
 
         executor = Parallel().executor
-        inequalities = executor.filter(
-            PartialFunction(Check_Rank_Tpi, self.V, self.tpi_method),
-            self._tqdm(ineq_dataset.pending(), unit="ineq"),
-            chunk_size=executor.chunk_size * 32,
-        )
+        pending_ineq = self._tqdm(ineq_dataset.pending(), unit="ineq")
+        inequalities: Iterable[Inequality]
+
+        if self.tpi_batch:
+            from itertools import groupby, chain
+            batches = (
+                list(group)
+                for _, group in groupby(pending_ineq, key=lambda ineq: ineq.tau)
+            )
+            inequalities = chain.from_iterable(executor.map(
+                PartialFunction(PiDominancyStep.filter_batch, self.V, self.tpi_method),
+                batches,
+            ))
+        else:
+            inequalities = executor.filter(
+                PartialFunction(Check_Rank_Tpi, self.V, self.tpi_method),
+                pending_ineq,
+                chunk_size=executor.chunk_size * 32,
+            )
         return self.TDataset.from_separate(
             pending=inequalities,
             validated=ineq_dataset.validated(),
@@ -643,9 +759,14 @@ class PiDominancyStep(FilterStep[Inequality]):
         group.add_argument(
             "--tpi_method",
             type=lambda s: to_literal(Method, s),
-            choices=("probabilistic", "symbolic"),
+            choices=("probabilistic", "symbolic", "modular"),
             default="probabilistic",
-            help="Method for the surjectivity of Tpi",
+            help="Method for the surjectivity of Tpi (modular: probabilistic method with ranks computed over GF(p))",
+        )
+        group.add_argument(
+            "--tpi_batch",
+            action="store_true",
+            help="Check together the inequalities of a same tau so that to share the computation of common blocks",
         )
 
     @classmethod
@@ -655,6 +776,7 @@ class PiDominancyStep(FilterStep[Inequality]):
             V=V,
             config=config,
             tpi_method=config.tpi_method,
+            tpi_batch=config.tpi_batch,
             **kwargs,
         )
     
@@ -695,41 +817,151 @@ class BKRConditionStep(FilterStep[Inequality]):
     BKR condition
     
     It only reject pending inequalities and doesn't modified the validated ones.
+
+    If a plethysm cache file is given, the plethysm decompositions are merged
+    into it once all the inequalities are processed. Likewise, the Kronecker
+    coefficients are merged into the given Kronecker cache file.
+
+    When the Kronecker coefficients are stored in a database (shared by the
+    processes), the inequalities are checked in parallel and the workers
+    consult and publish the coefficients through this database.
     """
     kronecker: KroneckerCoefficient
     plethysm: PlethysmCache
+    plethysm_cache: Optional[str]
+    kronecker_cache: Optional[str]
 
     def __init__(self,
                  V: Representation,
                  kronecker: KroneckerCoefficient = KroneckerCoefficientMLCache(),
                  plethysm: PlethysmCache = PlethysmCache(),
+                 plethysm_cache: Optional[str] = None,
+                 kronecker_cache: Optional[str] = None,
                  **kwargs: Any):
         super().__init__(V, **kwargs)
         self.kronecker = kronecker
         self.plethysm = plethysm
+        self.plethysm_cache = plethysm_cache
+        self.kronecker_cache = kronecker_cache
+
+    @property
+    def is_kronecker_shared(self) -> bool:
+        """ True if the Kronecker coefficients are stored in a store shared by the processes """
+        from .kronecker import KroneckerCoefficientDBCache
+        return isinstance(self.kronecker, KroneckerCoefficientDBCache)
+
+    def save_caches(self) -> None:
+        """ Save the caches in the given files """
+        from .utils import getLogger
+        logger = getLogger(type(self).__name__)
+        if self.plethysm_cache is not None:
+            added = self.plethysm.merge_cache(self.plethysm_cache)
+            logger.info(f"{added} plethysm decompositions added to {self.plethysm_cache}.pkl.xz")
+        if self.kronecker_cache is not None and isinstance(self.kronecker, KroneckerCoefficientCache):
+            added = self.kronecker.merge_cache(self.kronecker_cache)
+            logger.info(f"{added} Kronecker decompositions added to {self.kronecker_cache}.pkl.xz")
+
+    def close_caches(self) -> None:
+        """ Close (and remove) the temporary Kronecker database of the shared_cache method """
+        from .kronecker import KroneckerCoefficientDBCache
+        if isinstance(self.kronecker, KroneckerCoefficientDBCache) and self.kronecker.temporary:
+            self.kronecker.close()
+
+    def _save_caches_after(self, elements: Iterable[U]) -> Iterator[U]:
+        """
+        Yield the given elements and then save the caches
+
+        The temporary database is closed even if the elements are not all consumed
+        (interrupted step or raised exception).
+        """
+        try:
+            yield from elements
+            self.save_caches()
+        finally:
+            self.close_caches()
+
+    @staticmethod
+    def check_inequality(
+            ineq: Inequality,
+            V: Representation,
+            kronecker: KroneckerCoefficient,
+            plethysm: Optional[PlethysmCache] = None) -> bool:
+        """
+        Helper method that returns True if the inequality passes the BKR condition
+
+        If plethysm is None, the default plethysm cache of the process is used.
+        """
+        from .bkr import Multiplicity_SV_tau
+        if list(ineq.inversions) == []:
+            return True
+
+        if plethysm is None:
+            keep = Multiplicity_SV_tau(ineq.tau, ineq.weight_det(V), V, True, kronecker)
+        else:
+            keep = Multiplicity_SV_tau(ineq.tau, ineq.weight_det(V), V, True, kronecker, plethysm)
+        assert isinstance(keep, bool)
+        return keep
+
+    #: Plethysm cache of a parallel worker whose computed decompositions are sent to the main process
+    _worker_plethysm: Optional[PlethysmCache] = None
+
+    @staticmethod
+    def check_inequality_with_plethysm(
+            ineq: Inequality,
+            V: Representation,
+            kronecker: KroneckerCoefficient,
+            ) -> tuple[Inequality, bool, list[tuple[tuple[Partition, Partition], dict[Partition, int]]]]:
+        """
+        Helper method that returns the inequality, the result of `check_inequality` (with
+        the plethysm cache of the process) and the plethysm decompositions computed for it
+        """
+        if BKRConditionStep._worker_plethysm is None:
+            BKRConditionStep._worker_plethysm = PlethysmCache(track_computed=True)
+        plethysm = BKRConditionStep._worker_plethysm
+        return ineq, BKRConditionStep.check_inequality(ineq, V, kronecker, plethysm), plethysm.pop_computed()
+
+    def _collect_plethysm(self, results: Iterable[tuple[Inequality, bool, list[tuple[tuple[Partition, Partition], dict[Partition, int]]]]]) -> Iterator[Inequality]:
+        """ Keep the inequalities that pass the check and add the plethysm decompositions of the workers to the cache """
+        for ineq, keep, computed in results:
+            self.plethysm.update(computed)
+            if keep:
+                yield ineq
 
     def apply(self, ineq_dataset: Dataset[Inequality]) -> Dataset[Inequality]:
         from .representation import ParticleRepresentation
         if isinstance(self.V, ParticleRepresentation) and self.G[0] >= 8:
-            return self.TDataset.from_all(ineq_dataset.all())
-        
-        from .bkr import Multiplicity_SV_tau
-        inequalities: list[Inequality] = []
-        def ineq_filter(ineq: Inequality) -> bool:
-            if list(ineq.inversions) == []:
-                return True
-            else:
-                keep = Multiplicity_SV_tau(
-                    ineq.tau,
-                    ineq.weight_det(self.V),
-                    self.V,
-                    True,
-                    self.kronecker, self.plethysm)
-                assert isinstance(keep, bool)
-                return keep
+            # Nothing is checked but the caches are still saved (and a temporary database closed)
+            return self.TDataset.from_all(self._save_caches_after(ineq_dataset.all()))
         
+        from .parallel import Parallel
+        from .utils import PartialFunction
+
+        executor = Parallel().executor
+        pending_ineq = self._tqdm(ineq_dataset.pending(), unit="ineq")
+        inequalities: Iterable[Inequality]
+
+        if executor.is_parallel and self.is_kronecker_shared and self.plethysm_cache is not None:
+            # The plethysm decompositions computed by the workers are sent back to be saved
+            inequalities = self._collect_plethysm(executor.map(
+                PartialFunction(BKRConditionStep.check_inequality_with_plethysm, self.V, self.kronecker),
+                pending_ineq,
+                chunk_size=executor.chunk_size * 32,
+            ))
+        elif executor.is_parallel and self.is_kronecker_shared:
+            # The plethysm caches are kept in each process
+            inequalities = executor.filter(
+                PartialFunction(BKRConditionStep.check_inequality, self.V, self.kronecker),
+                pending_ineq,
+                chunk_size=executor.chunk_size * 32,
+            )
+        else:
+            inequalities = filter(
+                PartialFunction(BKRConditionStep.check_inequality, self.V, self.kronecker, self.plethysm),
+                pending_ineq,
+            )
+
         return self.TDataset.from_separate(
-            pending=filter(ineq_filter, self._tqdm(ineq_dataset.pending(), unit="ineq")),
+            pending=self._save_caches_after(inequalities),
             validated=ineq_dataset.validated(),
         )
     
@@ -744,32 +976,93 @@ class BKRConditionStep(FilterStep[Inequality]):
         )
         group.add_argument(
             "--kronecker",
-            choices=("no_cache", "cache", "ml_cache"),
+            choices=("no_cache", "cache", "ml_cache", "db_cache", "shared_cache", "character_table"),
             default="ml_cache",
-            help="Method for computing Kronecker coefficient"
+            help="Method for computing Kronecker coefficient (db_cache: multi-level cache stored in the database given by --kronecker_db, shared_cache: multi-level cache shared by the parallel workers through a temporary database, character_table: from the character tables of the symmetric groups without Sage)"
+        )
+        group.add_argument(
+            "--kronecker_db",
+            type=str,
+            default=None,
+            help="Database file of the Kronecker coefficients, required by the db_cache method (use convert_cache_to_db to import a .pkl.xz cache)",
+        )
+        group.add_argument(
+            "--kronecker_cache",
+            type=str,
+            default=None,
+            help="File prefix (.pkl.xz is appended) of a Kronecker cache that is loaded if it exists and in which the computed decompositions (including those of the parallel workers for the db_cache and shared_cache methods) are merged at the end of the step (not available for the no_cache and character_table methods)",
+        )
+        group.add_argument(
+            "--bkr_cache_size",
+            type=int,
+            default=None,
+            help="Maximal number of decompositions kept in memory by the Kronecker and plethysm caches (least recently used ones are evicted, unlimited by default)",
+        )
+        group.add_argument(
+            "--character_table_dir",
+            type=str,
+            default=None,
+            help="Directory where the character tables of the character_table method are saved and reused",
+        )
+        group.add_argument(
+            "--plethysm_cache",
+            type=str,
+            default=None,
+            help="File prefix (.pkl.xz is appended) of a plethysm cache that is loaded if it exists and in which the computed decompositions (including those of the parallel workers) are merged at the end of the step",
         )
 
     @classmethod
     def from_config(cls: type[Self], V: Representation, config: Namespace, **kwargs: Any) -> "BKRConditionStep":
         """ Build a step from the representation and the command-line arguments """
         from . import kronecker as kro
+        import os
+
+        if config.kronecker == "db_cache" and config.kronecker_db is None:
+            raise ValueError("The db_cache method for computing Kronecker coefficients needs a database file (--kronecker_db)")
+        if config.kronecker_cache is not None and config.kronecker in ("no_cache", "character_table"):
+            raise ValueError(f"--kronecker_cache cannot be used with the {config.kronecker} method for computing Kronecker coefficients")
+
+        # Existing Kronecker cache file
+        kronecker_prefix: Optional[str] = None
+        if config.kronecker_cache is not None and os.path.exists(config.kronecker_cache + ".pkl.xz"):
+            kronecker_prefix = config.kronecker_cache
 
         kronecker: KroneckerCoefficient
         match config.kronecker:
             case "no_cache":
                 kronecker = kro.KroneckerCoefficient()
             case "cache":
-                kronecker = kro.KroneckerCoefficientCache()
+                kronecker = kro.KroneckerCoefficientCache(kronecker_prefix, maxsize=config.bkr_cache_size)
             case "ml_cache":
-                kronecker = kro.KroneckerCoefficientMLCache()
+                kronecker = kro.KroneckerCoefficientMLCache(kronecker_prefix, maxsize=config.bkr_cache_size)
+            case "db_cache" | "shared_cache":
+                if config.kronecker == "db_cache":
+                    db_file, temporary = config.kronecker_db, False
+                else:
+                    import tempfile
+                    fd, db_file = tempfile.mkstemp(prefix="kronecker_", suffix=".sqlite")
+                    os.close(fd)
+                    temporary = True
+                # The loaded decompositions are stored in the database so that the workers see them
+                if kronecker_prefix is not None:
+                    kro.convert_cache_to_db(kronecker_prefix, db_file)
+                kronecker = kro.KroneckerCoefficientDBCache(db_file, maxsize=config.bkr_cache_size, temporary=temporary)
+            case "character_table":
+                kronecker = kro.KroneckerCoefficientCharacterTable(config.character_table_dir)
             case _:
                 raise ValueError(f"Invalid Kronecker type {config.kronecker}")
+
+        plethysm = PlethysmCache(maxsize=config.bkr_cache_size)
+        if config.plethysm_cache is not None and os.path.exists(config.plethysm_cache + ".pkl.xz"):
+            plethysm.load_cache(config.plethysm_cache)
             
         return super().from_config(
             V=V,
             config=config,
             kronecker=kronecker,
-            plethysm=PlethysmCache(),
+            plethysm=plethysm,
+            plethysm_cache=config.plethysm_cache,
+            kronecker_cache=config.kronecker_cache,
             **kwargs
         )
     
@@ -781,18 +1074,31 @@ class BirationalityStep(FilterStep[Inequality]):
     
     It only outputs validated inequalities (non redondant) and reject all other inequalities
     (no pending inequalities remaining).
+
+    If a time limit is given, the inequalities whose check exceeds it are deferred
+    and retried at the end with a larger limit. Those that are still undecided
+    remain pending.
     """
     ram_schub_method: Method
     ram0_method: Method
+    ram_timeout: float
+    ram_retry_factor: float
+    modular_fallback: bool
 
     def __init__(self,
                  V: Representation,
                  ram_schub_method: Method = "probabilistic",
                  ram0_method: Method = "probabilistic",
+                 ram_timeout: float = 0,
+                 ram_retry_factor: float = 10,
+                 modular_fallback: bool = False,
                  **kwargs: Any):
         super().__init__(V, **kwargs)
         self.ram_schub_method = ram_schub_method
         self.ram0_method = ram0_method
+        self.modular_fallback = modular_fallback
+        self.ram_timeout = ram_timeout
+        self.ram_retry_factor = ram_retry_factor
 
     def apply(self, ineq_dataset: Dataset[Inequality]) -> Dataset[Inequality]:
         from .ramification import Is_Ram_contracted
@@ -801,15 +1107,57 @@ class BirationalityStep(FilterStep[Inequality]):
         from itertools import chain
 
         executor = Parallel().executor
-        inequalities = executor.filter(
-            PartialFunction(Is_Ram_contracted, self.V, self.ram_schub_method, self.ram0_method),
+        if self.ram_timeout <= 0:
+            inequalities = executor.filter(
+                PartialFunction(Is_Ram_contracted, self.V, self.ram_schub_method, self.ram0_method, self.modular_fallback),
+                self._tqdm(ineq_dataset.pending(), unit="ineq"),
+            )
+            return self.TDataset.from_separate(
+                pending=[],
+                validated=chain(inequalities, ineq_dataset.validated()),
+            )
+
+        from .utils import getLogger
+        logger = getLogger(type(self).__name__)
+        validated, deferred = self.check_with_timeout(
             self._tqdm(ineq_dataset.pending(), unit="ineq"),
+            self.ram_timeout,
         )
+        if deferred and self.ram_retry_factor > 0:
+            logger.info(f"{len(deferred)} inequalities deferred, retrying them with a {self.ram_timeout * self.ram_retry_factor}s time limit")
+            retry_validated, deferred = self.check_with_timeout(
+                self._tqdm(deferred, unit="ineq"),
+                self.ram_timeout * self.ram_retry_factor,
+            )
+            validated += retry_validated
+        if deferred:
+            logger.info(f"{len(deferred)} inequalities remain undecided")
 
         return self.TDataset.from_separate(
-            pending=[],
-            validated=chain(inequalities, ineq_dataset.validated()),
+            pending=deferred,
+            validated=chain(validated, ineq_dataset.validated()),
         )
+
+    def check_with_timeout(self, inequalities: Iterable[Inequality], lim: float) -> tuple[list[Inequality], list[Inequality]]:
+        """ Returns the validated inequalities and the ones whose check exceeds the time limit """
+        from .ramification import Is_Ram_contracted_with_timeout
+        from .parallel import Parallel
+        from .utils import PartialFunction
+
+        inequalities = list(inequalities)
+        results = Parallel().executor.map(
+            PartialFunction(Is_Ram_contracted_with_timeout, self.V, self.ram_schub_method, self.ram0_method, lim, self.modular_fallback),
+            inequalities,
+            unordered=False,
+        )
+        validated: list[Inequality] = []
+        deferred: list[Inequality] = []
+        for ineq, result in zip(inequalities, results):
+            if result is None:
+                deferred.append(ineq)
+            elif result:
+                validated.append(ineq)
+        return validated, deferred
     
     @staticmethod
     def add_arguments(parent_parser: ArgumentParser, defaults: Mapping[str, Any] = {}) -> None:
@@ -825,14 +1173,31 @@ class BirationalityStep(FilterStep[Inequality]):
             type=lambda s: to_literal(Method, s),
             choices=method_choices,
             default="probabilistic",
-            help="Method for checking if the Bruhat ramification divisors are contracted (p for probabilistic, s for symbolic)"
+            help="Method for checking if the Bruhat ramification divisors are contracted (p for probabilistic, s for symbolic, m for modular)"
+        )
+        group.add_argument(
+            "--modular_fallback",
+            action="store_true",
+            help="With the modular method, confirm the deficient ranks over GF(p) by an exact computation over QQ[I]",
         )
         group.add_argument(
             "--ram0_method",
             type=lambda s: to_literal(Method, s),
             choices=method_choices,
             default="probabilistic",
-            help="Method for checking if R0 is contracted (p for probabilistic, s for symbolic)"
+            help="Method for checking if R0 is contracted (p for probabilistic, s for symbolic, modular: probabilistic with the tests in number fields done modulo a prime)"
+        )
+        group.add_argument(
+            "--ram_timeout",
+            type=float,
+            default=0,
+            help="Maximal processing time per inequality when checking birationality, the other ones are deferred (<= 0 to disable the limit)",
+        )
+        group.add_argument(
+            "--ram_retry_factor",
+            type=float,
+            default=10,
+            help="Factor applied to ram_timeout when retrying the deferred inequalities, the ones still exceeding it remain pending (<= 0 to disable the retry)",
         )
         
     @classmethod
@@ -843,6 +1208,9 @@ class BirationalityStep(FilterStep[Inequality]):
             config=config,
             ram_schub_method=config.ram_schub_method,
             ram0_method=config.ram0_method,
+            ram_timeout=config.ram_timeout,
+            ram_retry_factor=config.ram_retry_factor,
+            modular_fallback=config.modular_fallback,
             **kwargs,
         )
     
@@ -855,31 +1223,69 @@ class GrobnerStep(FilterStep[Inequality]):
     It only outputs validated inequalities (non redondant) and reject all other inequalities
     unless timeout is reached. In that case, the inequalities whose validation takes too much time
     are set as pending.
+
+    With the modular method, the negative answers can be confirmed over QQ[I] (grobner_confirm).
+
+    If a time budget is given, the inconclusive inequalities are checked again
+    in further rounds, the time limit being multiplied by grobner_timeout_factor
+    at each round, until the budget (total wall time of these rounds) is spent.
     """
     method: Method
     timeout: float
+    confirm: bool
+    timeout_factor: float
+    budget: float
 
     def __init__(self,
                  V: Representation,
                  grobner_method: Method = "probabilistic",
                  grobner_timeout: float = 1,
+                 grobner_confirm: bool = False,
+                 grobner_timeout_factor: float = 10,
+                 grobner_budget: float = 0,
                  **kwargs: Any):
         super().__init__(V, **kwargs)
         self.method = grobner_method
         self.timeout = grobner_timeout
+        self.confirm = grobner_confirm
+        self.timeout_factor = grobner_timeout_factor
+        self.budget = grobner_budget
 
     def apply(self, ineq_dataset: Dataset[Inequality]) -> ListDataset[Inequality]:
-        from .groebner import Grobner_List_Test
         from itertools import chain
-        grobner_true, grobner_inconclusive = Grobner_List_Test(
+        import time
+        from .groebner import Grobner_List_Test
+        from .utils import getLogger
+        logger = getLogger(type(self).__name__)
+
+        lim = self.timeout
+        validated, inconclusive = Grobner_List_Test(
             self._tqdm(ineq_dataset.pending(), unit="ineq"),
-            lim=self.timeout,
-            V=self.V,
-            method=self.method,
+            lim,
+            self.V,
+            self.method,
+            self.confirm,
         )
+        logger.info(f"Round 1 ({lim}s limit): {len(validated)} validated, {len(inconclusive)} inconclusive")
+
+        start = time.perf_counter()
+        round_index = 1
+        while inconclusive and lim > 0 and self.timeout_factor > 1 and time.perf_counter() - start < self.budget:
+            round_index += 1
+            lim = min(lim * self.timeout_factor, self.budget - (time.perf_counter() - start))
+            round_validated, inconclusive = Grobner_List_Test(
+                self._tqdm(inconclusive, unit="ineq"),
+                lim,
+                self.V,
+                self.method,
+                self.confirm,
+            )
+            validated += round_validated
+            logger.info(f"Round {round_index} ({lim:.3g}s limit): {len(round_validated)} validated, {len(inconclusive)} inconclusive")
+
         return ListDataset.from_separate(
-            pending=grobner_inconclusive,
-            validated=chain(ineq_dataset.validated(), grobner_true),
+            pending=inconclusive,
+            validated=chain(ineq_dataset.validated(), validated),
         )
 
     @staticmethod
@@ -896,7 +1302,7 @@ class GrobnerStep(FilterStep[Inequality]):
             type=lambda s: to_literal(Method, s),
             choices=method_choices,
             default="probabilistic",
-            help="Method for checking if the fiber is a single point or not (p for probabilistic, s for symbolic)"
+            help="Method for checking if the fiber is a single point or not (p for probabilistic, s for symbolic, modular: probabilistic method with the Gröbner basis computed over GF(p))"
         )
         group.add_argument(
             "--grobner_timeout",
@@ -904,6 +1310,23 @@ class GrobnerStep(FilterStep[Inequality]):
             default=1,
             help="Maximal processing time per inequality when checking birationaly (<= 0 to disable the limit)",
         )
+        group.add_argument(
+            "--grobner_confirm",
+            action="store_true",
+            help="With the modular method, check again over QQ[I] the inequalities whose fiber is not a single point",
+        )
+        group.add_argument(
+            "--grobner_budget",
+            type=float,
+            default=0,
+            help="Total wall time (in seconds) of the additional rounds that check again the inconclusive inequalities with increasing time limits (<= 0 for a single round)",
+        )
+        group.add_argument(
+            "--grobner_timeout_factor",
+            type=float,
+            default=10,
+            help="Factor applied to the time limit at each additional round",
+        )
         
     @classmethod
     def from_config(cls: type[Self], V: Representation, config: Namespace, **kwargs: Any) -> "GrobnerStep":
@@ -913,6 +1336,9 @@ class GrobnerStep(FilterStep[Inequality]):
             config=config,
             grobner_method=config.grobner_method,
             grobner_timeout=config.grobner_timeout,
+            grobner_confirm=config.grobner_confirm,
+            grobner_timeout_factor=config.grobner_timeout_factor,
+            grobner_budget=config.grobner_budget,
             **kwargs,
         )
 
@@ -1032,13 +1458,13 @@ class MomentConeStep(GeneratorStep[Inequality]):
         self.options = kwargs
         self.steps = []
 
-    def __add_step(self, step_type: type[TStep]) -> TStep:
+    def __add_step(self, step_type: type[TStep], **kwargs: Any) -> TStep:
         """ Create and configure a new step """
         dataset_type = LazyDataset if self.lazy else ListDataset
         if self.config is None:
-            step = step_type(self.V, dataset_type=dataset_type, **self.options)
+            step = step_type(self.V, dataset_type=dataset_type, **(self.options | kwargs))
         else:
-            step = step_type.from_config(self.V, self.config, dataset_type=dataset_type)
+            step = step_type.from_config(self.V, self.config, dataset_type=dataset_type, **kwargs)
         
         if self.store_steps:
             self.steps.append(step)
@@ -1089,7 +1515,7 @@ class MomentConeStep(GeneratorStep[Inequality]):
 
             # Pre-computation of Representation.TPi 3D matrix if necessary
             if 'PiDominancy' in self.filters or 'Birationality' in self.filters:
-                TPi_step = self.__add_step(TPiPreComputationStep)
+                TPi_step = self.__add_step(TPiPreComputationStep, filters=self.filters)
                 with Task(TPi_step.name):
                     ineq_candidates = TPi_step(ineq_candidates)
 
@@ -0,0 +1,97 @@
+"""
+Linear algebra over a prime finite field GF(p)
+
+It is used by the modular method as a fast alternative to the exact
+computations over QQ[I] of the probabilistic method: the same random integer
+data is reduced modulo a prime p ≡ 1 mod 4, so that a square root of -1 exists
+in GF(p) and plays the role of I.
+
+The rank over GF(p) of the reduction of a matrix is never greater than its rank
+over QQ[I]. Thus a full rank modulo p proves the full rank over QQ[I], whereas a
+deficient rank modulo p may be a false negative: it happens only if p divides
+all the maximal minors of the matrix (more precisely the prime ideal of ZZ[I]
+generated by p and I - sqrt(-1) mod p), that is with a probability of order 1/p
+(about 5e-10 for the default prime) for each tested matrix.
+
+The modular Method reduces the random point of the probabilistic method and
+stores T_Pi_3D as uint64 residues (see `Representation.T_Pi_3D`), so that the
+rank tests of the dominancy of pi and of the Bruhat ramification divisors use
+only word-size arithmetic, as well as the Gröbner bases of the fibers. These
+tests may thus be wrong with a probability of order 1/p each, in addition to
+the errors of the probabilistic method (random point in a proper Zariski-closed
+subset). The check of the ramification divisor R0 factorizes determinants
+over QQ as the probabilistic method, but its tests in the number fields defined
+by the factors are done modulo a prime of degree one.
+"""
+
+__all__ = (
+    "MODULAR_PRIME",
+    "sqrt_minus_one",
+    "gaussian_mod_p",
+    "rank_mod_p",
+)
+
+import functools
+import numpy as np
+from numpy.typing import NDArray
+
+from .typing import *
+
+#: Default prime used for the modular computations.
+#: Largest prime p < 2^31 with p ≡ 1 mod 4, so that the product of two residues fits in an int64.
+MODULAR_PRIME: Final[int] = 2147483629
+
+
+@functools.cache
+def sqrt_minus_one(p: int = MODULAR_PRIME) -> int:
+    """
+    Square root of -1 in GF(p) for a prime p ≡ 1 mod 4
+
+    >>> i = sqrt_minus_one(13)
+    >>> i, (i * i) % 13
+    (8, 12)
+    >>> i = sqrt_minus_one()
+    >>> (i * i) % MODULAR_PRIME == MODULAR_PRIME - 1
+    True
+    """
+    if p % 4 != 1:
+        raise ValueError(f"{p} is not a prime congruent to 1 mod 4")
+
+    # If g is not a square, g^((p-1)/4) is a square root of -1
+    for g in range(2, p):
+        if pow(g, (p - 1) // 2, p) == p - 1:
+            return pow(g, (p - 1) // 4, p)
+    raise ValueError(f"{p} is not a prime")
+
+
+def gaussian_mod_p(real: NDArray[np.int64], imag: NDArray[np.int64], p: int = MODULAR_PRIME) -> NDArray[np.int64]:
+    """
+    Reduction modulo p of the Gaussian integers real + I * imag
+
+    I is mapped to the square root of -1 returned by `sqrt_minus_one`.
+    The prime must be less than 2^31 to avoid overflows.
+
+    >>> gaussian_mod_p(np.array([1, -2]), np.array([0, 1]), 13)
+    array([1, 6])
+    """
+    return (np.mod(real, p) + sqrt_minus_one(p) * np.mod(imag, p)) % p
+
+
+def rank_mod_p(M: NDArray[np.int64], p: int = MODULAR_PRIME) -> int:
+    """
+    Rank over GF(p) of an integer matrix
+
+    >>> rank_mod_p(np.array([[1, 2, 3], [2, 4, 6]]))
+    1
+    >>> rank_mod_p(np.array([[1, 2], [3, 4]]))
+    2
+    >>> rank_mod_p(np.array([[1, 2], [3, 4]]), 2)
+    1
+    >>> rank_mod_p(np.zeros((0, 3), dtype=np.int64))
+    0
+    """
+    from flint import nmod_mat # type: ignore
+    nrows, ncols = M.shape
+    if nrows == 0 or ncols == 0:
+        return 0
+    return int(nmod_mat(nrows, ncols, np.mod(M, p).ravel().tolist(), p).rank())
@@ -4,6 +4,7 @@ from .blocks import Blocks
 from .linear_group import *
 
 from functools import cached_property
+import functools
 import itertools
 
 __all__ = (
@@ -370,6 +371,23 @@ class Permutation(tuple[int, ...]): # Remark: hash of p is hash of underlying tu
             for p in [Permutation(list(self[:i]) + [self[j]] + list(self[i+1:j]) + [self[i]] + list(self[j+1:]))]
             if (self[i] > self[j]+1) and (p.length == self.length - 1)
         )
+
+    def min_rep_covering_relations(self, symmetries: Iterable[int]) -> tuple["Permutation", ...]:
+        """
+        Covering relations strong Bruhat that are minimal representatives for the given symmetries
+
+        The result is cached per (permutation, symmetries) so that it is shared
+        between all the instances of a same permutation.
+
+        >>> p = Permutation((2, 3, 0, 1))
+        >>> p.covering_relations_strong_Bruhat
+        (Permutation((0, 3, 2, 1)), Permutation((2, 0, 3, 1)), Permutation((2, 1, 0, 3)))
+        >>> p.min_rep_covering_relations((1, 2, 1))
+        (Permutation((2, 0, 3, 1)),)
+        >>> p.min_rep_covering_relations((2, 2))
+        ()
+        """
+        return _min_rep_covering_relations(tuple(self), tuple(symmetries))
     
     @staticmethod
     def all_transpositions(n: int) -> Iterable["Permutation"]:
@@ -464,3 +482,13 @@ class AllPermutationsByLength:
             idx = fix_neg(idx)
             return self.permutations[self.indexes[idx]:self.indexes[idx + 1]]
         
+
+
+@functools.cache
+def _min_rep_covering_relations(p: tuple[int, ...], symmetries: tuple[int, ...]) -> tuple[Permutation, ...]:
+    """ Table of the minimal representative covering relations indexed by (permutation, symmetries) """
+    return tuple(
+        v
+        for v in Permutation(p).covering_relations_strong_Bruhat
+        if v.is_min_rep(symmetries)
+    )
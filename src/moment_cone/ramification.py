@@ -1,7 +1,11 @@
 __all__ = (
     'compute_d_minus_2_minors_via_adjugate',
     'is_not_contracted',
+    'number_field',
+    'prime_of_degree_one',
+    'R0_obstruction_mod_p',
     'Is_Ram_contracted',
+    'Is_Ram_contracted_with_timeout',
 )
 
 from random import randint
@@ -18,7 +22,16 @@ from .representation import *
 from .inequality import *
 from .permutation import *
 from .rings import QQ, I, matrix, vector, Matrix, Polynomial, PolynomialRing
-from .utils import prod,fl_dic,merge_factorizations
+from .utils import prod,fl_dic,merge_factorizations,LRUCache
+
+#: Verdicts of is_not_contracted for the divisors of the boundary, indexed by
+#: (V, method, modular fallback, tau, gradings of the positive weights, inversions mask) and shared
+#: by the inequalities checked in a same process
+boundary_divisor_cache: LRUCache[tuple[Representation, Method, bool, Tau, tuple[int, ...], int], bool] = LRUCache(maxsize=2**16)
+
+#: Number fields defined by the factors of the determinants in the R_0 check,
+#: indexed by (base field, defining polynomial)
+number_field_cache: LRUCache[tuple[Any, Polynomial], Any] = LRUCache(maxsize=1024)
 
     
 from itertools import combinations
@@ -95,17 +108,25 @@ def taylor_det_psi(k: int, A: Matrix, psi: Matrix, h_symbolic: bool = True) -> P
 
   
 def is_not_contracted(
-        inversions_v: Sequence[Root],
+        inversions_v: Sequence[Root] | int,
         V: Representation,
         method: Method,
         non_positive_weights: Sequence[Weight],
         positive_weights: Sequence[Weight],
+        modular_fallback: bool = False,
     ) -> bool:
     """
     ???
 
     The vector v is chosen depending on the method: probabilistic or symbolic.
 
+    The modular method reduces the data of the probabilistic method modulo a prime
+    p ≡ 1 mod 4 (see `moment_cone.modular`) and computes the rank over GF(p). This rank
+    may be deficient with a probability of order 1/p: with modular_fallback, a deficient
+    rank is confirmed by the exact computation over QQ[I].
+
+    The inversions of v can be given as a sequence of roots or as a bitmask (see `Root.mask_of_U`).
+
     FIXME: example
 
     >>> from moment_cone import *
@@ -121,30 +142,41 @@ def is_not_contracted(
     False
     >>> is_not_contracted(roots, V, "symbolic", positive_weights, non_positive_weights)
     False
+    >>> is_not_contracted(roots, V, "modular", positive_weights, non_positive_weights)
+    False
     """
 
     # Ring depending on the computational method
-    if method == "probabilistic":
+    if method == "probabilistic" or method == "modular":
         ring = V.QI
     elif method == "symbolic":
         ring = V.QV
     else:
         raise ValueError(f"Invalid value {method} of the computation method")
     
-    invs_idx=[a.index_in_all_of_U(V.G) for a in inversions_v]
-    npw_idx=[V.index_of_weight(chi) for chi in non_positive_weights]
-    pw_idx=[V.index_of_weight(chi) for chi in positive_weights]
+    if isinstance(inversions_v, int):
+        invs_idx=Root.indices_from_mask(inversions_v)
+    else:
+        invs_idx=Root.indices_in_all_of_U(inversions_v, V.G)
+    npw_idx=V.indices_of_weights(non_positive_weights)
+    pw_idx=V.indices_of_weights(positive_weights)
     rank_A: int
 
-    if method == "probabilistic" :
+    if method == "probabilistic" or method == "modular":
         for p in range(V.random_deep):
-            An = V.T_Pi_3D(method, "imaginary")[np.ix_([2*p, 2*p+1], npw_idx, pw_idx, invs_idx)].sum(axis=1)
-            A = matrix(
-                len(pw_idx),
-                len(invs_idx),
-                lambda i, j: QQ(An[0, i, j]) + I * QQ(An[1, i, j])
+            if method == "modular":
+                from .modular import rank_mod_p
+                rank_A = rank_mod_p(
+                    V.T_Pi_3D("modular", "imaginary")[np.ix_([p], npw_idx, pw_idx, invs_idx)].sum(axis=1)[0]
                 )
-            rank_A = A.rank()
+            if method == "probabilistic" or (modular_fallback and rank_A < len(invs_idx)):
+                An = V.T_Pi_3D("probabilistic", "imaginary")[np.ix_([2*p, 2*p+1], npw_idx, pw_idx, invs_idx)].sum(axis=1)
+                A = matrix(
+                    len(pw_idx),
+                    len(invs_idx),
+                    lambda i, j: QQ(An[0, i, j]) + I * QQ(An[1, i, j])
+                    )
+                rank_A = A.rank()
             if rank_A == len(invs_idx):
                     break
 
@@ -157,7 +189,102 @@ def is_not_contracted(
     return rank_A == len(invs_idx)
 
 
-def Is_Ram_contracted(ineq : Inequality, V: Representation, method_S: Method, method_R0: Method) -> bool :
+def number_field(delta: Polynomial, base: Optional[Any] = None) -> Any:
+    """
+    Number field defined by the irreducible polynomial delta, cached per process
+
+    If base is given, returns the extension of base defined by delta,
+    otherwise the absolute number field QQ[a]/(delta).
+    """
+    key = (base, delta)
+    try:
+        return number_field_cache[key]
+    except KeyError:
+        K = NumberField(delta, 'a') if base is None else base.extension(delta)
+        number_field_cache[key] = K
+        return K
+
+
+def prime_of_degree_one(delta: Polynomial, tries: int = 8) -> Optional[tuple[int, int]]:
+    """
+    Prime p and simple root r of delta modulo p
+
+    Mapping a to r is then the reduction modulo a prime of degree one of the
+    number field QQ[a]/(delta). The primes are searched downward from MODULAR_PRIME
+    and None is returned if no suitable prime is found in the given tries.
+    """
+    from sage.all import GF, previous_prime # type: ignore
+    from .modular import MODULAR_PRIME
+
+    f = delta * delta.denominator()
+    p = MODULAR_PRIME
+    for _ in range(tries):
+        if f.leading_coefficient() % p != 0:
+            roots = [r for r, m in f.change_ring(GF(p)).roots() if m == 1]
+            if roots:
+                return p, int(roots[0])
+        p = int(previous_prime(p))
+    return None
+
+
+def _line_mod_p(Mn: NDArray[np.int64], p: int, r: int) -> NDArray[np.int64]:
+    """ Reduction modulo p of the matrix Mn[0] * z + Mn[1] at z = r """
+    return (np.mod(Mn[0], p) * r + np.mod(Mn[1], p)) % p
+
+
+def R0_obstruction_mod_p(
+        Azn: NDArray[np.int64],
+        B0zn: NDArray[np.int64],
+        Mn: NDArray[Any],
+        start: int,
+        stop: int,
+        delta: Polynomial,
+        tries: int = 8,
+    ) -> Optional[bool]:
+    """
+    Modular version of the test L0 * B0z_red * kernel(Ared) != 0 of the R_0 check
+    for a factor delta of valuation one in the determinant of the diagonal block
+    of Az of rows and columns range(start, stop)
+
+    Az and B0z are the matrices Azn[0] * z + Azn[1] and B0zn[0] * z + B0zn[1],
+    Ared is made of the columns of Az from start and Mn[k] is the action matrix
+    defining the k-th coefficient of L0 with the comatrix of the diagonal block.
+
+    Everything is reduced modulo a prime of degree one of QQ[a]/(delta) (see
+    `prime_of_degree_one`). If Ared has corank one modulo this prime, the reduction
+    of the kernel of Ared over the number field spans its kernel modulo the prime.
+    A non-zero value modulo the prime thus proves that the value is non-zero over
+    the number field.
+
+    Returns True if the value is non-zero modulo the prime, False if it vanishes
+    modulo the prime and None if the test is inconclusive (no suitable prime found
+    or corank greater than one modulo the prime).
+    """
+    from sage.all import GF # type: ignore
+
+    reduction = prime_of_degree_one(delta, tries)
+    if reduction is None:
+        return None
+    p, r = reduction
+    F = GF(p)
+
+    A = _line_mod_p(Azn, p, r)
+    Ared = matrix(F, A[:, start:].tolist())
+    if Ared.rank() != Ared.ncols() - 1:
+        return None
+    kernel = [int(x) for x in Ared.right_kernel().basis()[0]]
+
+    n = stop - start
+    comatrix = matrix(F, A[start:stop, start:stop].tolist()).adjugate().transpose()
+    comatrix_np = np.array([int(x) for x in comatrix.list()], dtype=np.int64).reshape(n, n)
+    L0 = ((np.mod(Mn.astype(np.int64), p) * comatrix_np) % p).sum(axis=(1, 2)) % p
+
+    # Python integers to avoid the overflows of the products of residues
+    B0 = _line_mod_p(B0zn, p, r)[:, start:].astype(object)
+    return int((L0.astype(object) @ B0 % p) @ np.array(kernel, dtype=object)) % p != 0
+
+
+def Is_Ram_contracted(ineq : Inequality, V: Representation, method_S: Method, method_R0: Method, modular_fallback: bool = False) -> bool :
     from .utils import getLogger
     logger = getLogger("ramification.Is_Ram_contracted")
 
@@ -166,6 +293,12 @@ def Is_Ram_contracted(ineq : Inequality, V: Representation, method_S: Method, me
     dU=len(Inv_w)
     if dU<=1 : 
         return(True)
+    modular_R0 = method_R0 == "modular"
+    if modular_R0:
+        # R0 needs the factorization of determinants over QQ: the probabilistic
+        # computation is used, the tests in number fields being done modulo a prime
+        # (see R0_obstruction_mod_p)
+        method_R0 = "probabilistic"
     if method_R0 == "probabilistic" :
         ring_R0= V.QZ
     elif method_R0 == "symbolic":
@@ -183,28 +316,35 @@ def Is_Ram_contracted(ineq : Inequality, V: Representation, method_S: Method, me
     sorted_weightsU = sorted(gr_rootU.keys())
     Pos_Weights_sorted=list(itertools.chain.from_iterable(tau.positive_weights(V)[x] for x in sorted(gr_inv.keys(),reverse=True)))
     fl_inv_w=fl_dic(gr_inv,sorted_weightsU)
+    pos_gradings = tuple(sorted(gr_inv.keys()))
     
     ### Divisors of the boudary
     for k,w in enumerate(ws):
-        for v in w.covering_relations_strong_Bruhat:
-            if v.is_min_rep(tau.reduced.mult[k]): 
-                vs = list(ws[:k]) + [v] + list(ws[k+1:])
-                ineqv = Inequality(tau,w=tuple(vs))
-                fl_inv_v=fl_dic(ineqv.gr_inversions,sorted_weightsU)
-                if any([fl_inv_v[key] > fl_inv_w[key] for key in fl_inv_v.keys()]):
-                    continue
-                if is_not_contracted(tuple(ineqv.inversions),V,method_S,Neg0_Weights_sorted,Pos_Weights_sorted) :
-                    return(False)
+        for v in w.min_rep_covering_relations(tau.reduced.mult[k]):
+            vs = list(ws[:k]) + [v] + list(ws[k+1:])
+            ineqv = Inequality(tau,w=tuple(vs))
+            fl_inv_v=fl_dic(ineqv.gr_inversions,sorted_weightsU)
+            if any([fl_inv_v[key] > fl_inv_w[key] for key in fl_inv_v.keys()]):
+                continue
+            # The verdict only depends on tau, on the used positive weights and on the inversions of vs
+            cache_key = (V, method_S, modular_fallback, tau, pos_gradings, ineqv.inversions_mask)
+            try:
+                not_contracted = boundary_divisor_cache[cache_key]
+            except KeyError:
+                not_contracted = is_not_contracted(ineqv.inversions_mask,V,method_S,Neg0_Weights_sorted,Pos_Weights_sorted,modular_fallback)
+                boundary_divisor_cache[cache_key] = not_contracted
+            if not_contracted:
+                return(False)
                 
     ### Divisor R_0
     # Indices of roots and weights    
     List_C_mult_dec=sorted(gr_inv.keys(), reverse=True) 
     InversionSorted=list(itertools.chain.from_iterable(
             gr_inv[x] for x in List_C_mult_dec))   
-    inv_idx=[a.index_in_all_of_U(V.G) for a in InversionSorted]
-    pw_idx=[V.index_of_weight(chi) for chi in Pos_Weights_sorted]
-    npw_idx=[V.index_of_weight(chi) for chi in Neg0_Weights_sorted]
-    zw_idx=[V.index_of_weight(chi) for chi in tau.orthogonal_weights(V)]
+    inv_idx=Root.indices_in_all_of_U(InversionSorted, V.G)
+    pw_idx=V.indices_of_weights(Pos_Weights_sorted)
+    npw_idx=V.indices_of_weights(Neg0_Weights_sorted)
+    zw_idx=V.indices_of_weights(tau.orthogonal_weights(V))
 
 
     sizeblocks=[0]
@@ -245,21 +385,36 @@ def Is_Ram_contracted(ineq : Inequality, V: Representation, method_S: Method, me
         # Running over the delta. Starting with small multiplicities.
         for delta in sorted(merged_deltas, key=lambda d: (merged_deltas[d][1],merged_deltas[d][3])):
             i = merged_deltas[delta][0]
+            y_weight = List_C_mult_dec[i]
+            y_pw_idx = V.indices_of_weights(tau.positive_weights(V)[y_weight])
+            y_inv_idx = Root.indices_in_all_of_U(gr_inv[y_weight], V.G)
+            if merged_deltas[delta][1] == 1: # valuation of delta in J_i is 1
+                Mn_L0 = V.T_Pi_3D('symbolic_int')[np.ix_(zw_idx, y_pw_idx, y_inv_idx)]
+
+            if method_R0 == 'probabilistic' and merged_deltas[delta][1] == 1:
+                # An obstruction modulo a prime is conclusive. Otherwise (e.g. for a contracted R_0),
+                # the exact test is still done in the (cached) number field, unless with the modular method
+                obstruction = R0_obstruction_mod_p(Azn, B0zn, Mn_L0, sizeblocks[i], sizeblocks[i + 1], delta)
+                if obstruction:
+                    return False
+                if obstruction is not None and modular_R0:
+                    continue # No obstruction modulo a prime of degree one
+
             if method_R0 == 'symbolic' :
-                K = K0.extension(delta)
+                K = number_field(delta, K0)
             else :
-                K=NumberField(delta, 'a')
-            #a = K.gen()
+                K = number_field(delta)
             Ared=Az.matrix_from_columns(range(sizeblocks[i], Az.ncols())).change_ring(K)
-            # Block used to compoute L0
 
-            if merged_deltas[delta][2] == 1  or Ared.rank() == Ared.ncols()-1 :
+            # Since delta divides the determinant of the i-th diagonal block and Az is block triangular,
+            # the rank of Ared is at most its number of columns minus one.
+            kernel = Ared.right_kernel()
+            if kernel.dimension() == 1:
                 #if method_R0 == 'symbolic' : 
                 #    Ared=singular.matrix(Ared.list(),Ared.ncols()).transpose()
                 #    noyau = Ared.kernel()
                 #else :    
-                noyau=Ared.right_kernel().basis()[0]
-                y_weight = List_C_mult_dec[i]  
+                noyau=kernel.basis()[0]
                 Ared_i=Blocks_Az[i].change_ring(K) # block jmin modulo delta
                 ### Computation of L0
                 if  merged_deltas[delta][1] == 1 : # valuation of delta in J_i is 1   
@@ -267,10 +422,8 @@ def Is_Ram_contracted(ineq : Inequality, V: Representation, method_S: Method, me
                     if i not in dict_comat: # Compute the comatrix if not known
                         dict_comat[i] = Blocks_Az[i].adjugate().transpose()
                     com_Ared_i=dict_comat[i].change_ring(K)  
-                    for col,idx in enumerate(zw_idx):
-                        Mn = V.T_Pi_3D('symbolic_int')[
-                                    np.ix_([idx],[V.index_of_weight(chi) for chi in tau.positive_weights(V)[y_weight]], 
-                                    [alpha.index_in_all_of_U(V.G) for alpha in gr_inv[y_weight]])].sum(axis=0)
+                    for col in range(len(zw_idx)):
+                        Mn = Mn_L0[col]
                         nrow,ncol=Mn.shape
                         L0[col] = sum(
                                     Mn[r,s] * com_Ared_i[r,s]
@@ -280,10 +433,8 @@ def Is_Ram_contracted(ineq : Inequality, V: Representation, method_S: Method, me
                                 )
                 else : # Taylor of degree >=2
                     Mn = V.T_Pi_3D('symbolic')[
-                                    np.ix_([V.index_of_weight(chi) for chi in tau.orthogonal_weights(V)],
-                                    [V.index_of_weight(chi) for chi in tau.positive_weights(V)[y_weight]], 
-                                    [alpha.index_in_all_of_U(V.G) for alpha in gr_inv[y_weight]])].sum(axis=0)
-                            
+                                    np.ix_(zw_idx, y_pw_idx, y_inv_idx)].sum(axis=0)
+
                     psi = matrix(V.QV, Mn)
                     mult = merged_deltas[delta][1]
                     taylor_term=taylor_det_psi(mult, Ared_i, psi)      
@@ -303,6 +454,45 @@ def Is_Ram_contracted(ineq : Inequality, V: Representation, method_S: Method, me
                         
                 if L0*B0z_red*noyau != 0 :
                     return False         
+
+        if method_R0 != 'probabilistic':
+            # The symbolic line doesn't depend on the random point
+            break
                   
     return True                    
-                
\ No newline at end of file
+                
+
+
+def Is_Ram_contracted_with_timeout(
+        ineq: Inequality,
+        V: Representation,
+        method_S: Method,
+        method_R0: Method,
+        lim: float,
+        modular_fallback: bool = False,
+    ) -> Optional[bool]:
+    """
+    Is_Ram_contracted with a limited wall execution time (non-positive limit to disable it)
+
+    Returns None if the computation didn't finish in lim seconds.
+    As in `groebner.is_fiber_singleton_with_timeout`, the computation runs in a separate
+    process (see `timeout_process`), or in a fork of the worker process of a parallel
+    executor (see `timeout_fork`), that is killed when the limit is reached: an interrupted
+    computation thus never leaves Sage or the caches of the process in an incorrect state.
+    The verdicts cached by this computation (e.g. in `boundary_divisor_cache`) are then
+    not kept by the calling process.
+    """
+    import multiprocessing
+    from .task import timeout_fork, timeout_process, TimeOutException
+    args = (ineq, V, method_S, method_R0, modular_fallback)
+    try:
+        if multiprocessing.current_process().daemon:
+            return timeout_fork(Is_Ram_contracted, args, timeout=lim)
+        else:
+            return timeout_process(Is_Ram_contracted, args, timeout=lim)
+    except TimeOutException:
+        from .utils import getLogger
+        getLogger("ramification.Is_Ram_contracted_with_timeout").debug(
+            f"{ineq} did not complete in {lim} seconds"
+        )
+        return None
@@ -11,7 +11,6 @@ from functools import cached_property
 import itertools
 import numpy as np
 from numpy.typing import NDArray
-from typing import NamedTuple
 from argparse import ArgumentParser, Namespace
 
 from .typing import *
@@ -21,24 +20,386 @@ from .partition import Partition
 from .rings import Matrix, Vector, Ring, PolynomialRingForWeights,PolynomialRing, Polynomial, Variable, I
 from .root import Root
 
+if TYPE_CHECKING:
+    from tempfile import TemporaryDirectory
 
-class TPi3DResult(NamedTuple):
-    """ Result class of Representation.T_Pi_3D method """
-    Q: NDArray[np.int64]
-    QI: NDArray[np.int64]
-    QV: NDArray[Any]
-    QV_int: NDArray[Any]
-    line_Q: NDArray[Any]
-    line_QV: NDArray[Any]
-    dict_Q: list[dict[Polynomial, Polynomial]]
-    dict_QV: list[dict[Polynomial, Polynomial]] # FIXME: name and type is not correct anymore
+
+#: Default directory of the memory-mapped T_Pi_3D tensors (see `_default_tpi_dir`)
+_tpi_temporary_directory: "Optional[TemporaryDirectory[str]]" = None
+
+def _default_tpi_dir() -> str:
+    """
+    Temporary directory of the memory-mapped T_Pi_3D tensors when none is given
+
+    It is created once per process and removed with its content at exit.
+    """
+    global _tpi_temporary_directory
+    if _tpi_temporary_directory is None:
+        import tempfile
+        _tpi_temporary_directory = tempfile.TemporaryDirectory(prefix="moment_cone_tpi_")
+    return _tpi_temporary_directory.name
+
+
+class SparseTensor:
+    """
+    Sparse tensor whose last three dimensions are stored as (src, dst, root) triplets
+
+    The leading dimensions (e.g. the random deepness) are stored densely in the
+    values array of shape leading_shape + (nnz,).
+
+    Only the open mesh indexing returned by `np.ix_` is supported and it returns
+    the corresponding dense sub-tensor:
+
+    >>> src, dst, root = np.array([0, 1, 2]), np.array([1, 2, 0]), np.array([0, 0, 1])
+    >>> T = SparseTensor((2, 3, 3, 2), src, dst, root, np.array([[1, 2, 3], [4, 5, 6]]))
+    >>> T[np.ix_([1], [0, 1], [1, 2], [0])]
+    array([[[[4],
+             [0]],
+    <BLANKLINE>
+            [[0],
+             [5]]]])
+    >>> bool((T[np.ix_([0, 1], [2, 0], [0, 1], [1, 0])] == T.toarray()[np.ix_([0, 1], [2, 0], [0, 1], [1, 0])]).all())
+    True
+    """
+    shape: tuple[int, ...]
+    src: NDArray[np.intp]
+    dst: NDArray[np.intp]
+    root: NDArray[np.intp]
+    values: NDArray[Any]
+
+    def __init__(self,
+                 shape: tuple[int, ...],
+                 src: NDArray[np.intp],
+                 dst: NDArray[np.intp],
+                 root: NDArray[np.intp],
+                 values: NDArray[Any]):
+        """ Triplets are assumed to be distinct """
+        assert len(shape) >= 3 and values.shape == shape[:-3] + (len(src),)
+        self.shape = shape
+        self.src, self.dst, self.root = src, dst, root
+        self.values = values
+
+    @property
+    def dtype(self) -> np.dtype[Any]:
+        return self.values.dtype
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    @property
+    def nnz(self) -> int:
+        """ Number of stored triplets """
+        return len(self.src)
+
+    def __getitem__(self, key: tuple[Any, ...]) -> NDArray[Any]:
+        if not isinstance(key, tuple) or len(key) != self.ndim:
+            raise IndexError("SparseTensor only supports the open mesh indexing of np.ix_")
+        indices = [np.ravel(k) for k in key]
+        leading = indices[:-3]
+
+        # Position of each triplet in the requested (sorted and deduplicated) indices
+        selected = np.ones(self.nnz, dtype=bool)
+        positions: list[NDArray[np.intp]] = []
+        inverses: list[NDArray[np.intp]] = []
+        sizes: list[int] = []
+        for coords, idx, n in zip((self.src, self.dst, self.root), indices[-3:], self.shape[-3:]):
+            unique_idx, inverse = np.unique(idx, return_inverse=True)
+            lookup = np.full(n, -1, dtype=np.intp)
+            lookup[unique_idx] = np.arange(len(unique_idx))
+            pos = lookup[coords]
+            selected &= pos >= 0
+            positions.append(pos)
+            inverses.append(inverse.ravel())
+            sizes.append(len(unique_idx))
+
+        nz = np.flatnonzero(selected)
+        result = np.zeros(
+            tuple(len(idx) for idx in leading) + tuple(sizes),
+            dtype=self.dtype,
+        )
+        result[(Ellipsis,) + tuple(pos[nz] for pos in positions)] = self.values[np.ix_(*leading, nz)]
+        return result[(Ellipsis,) + np.ix_(*inverses)]
+
+    def toarray(self) -> NDArray[Any]:
+        """ Dense version of this tensor """
+        result = np.zeros(self.shape, dtype=self.dtype)
+        result[..., self.src, self.dst, self.root] = self.values
+        return result
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(shape={self.shape}, nnz={self.nnz}, dtype={self.dtype})"
+
+
+class PointwiseTensor:
+    """
+    Tensor of a random variant whose first dimension runs over the random points
+    (with `stride` consecutive indices per point), the sub-tensor of each point
+    being built at its first access.
+
+    A check that loops over the points and stops at the first conclusive one
+    thus only builds the points it actually uses.
+
+    Supports integer indexing and the open mesh indexing of `np.ix_`:
+
+    >>> T = PointwiseTensor((3, 2, 2, 1), 1, lambda p: np.full((1, 2, 2, 1), p))
+    >>> T[np.ix_([0, 2], [1], [0, 1], [0])]
+    array([[[[0],
+             [0]]],
+    <BLANKLINE>
+    <BLANKLINE>
+           [[[2],
+             [2]]]])
+    >>> T.built_points
+    [0, 2]
+
+    Integer indexing returns a view on a stored dense point:
+
+    >>> np.shares_memory(T[1], T.point(1))
+    True
+    """
+    shape: tuple[int, ...]
+    stride: int #: Number of indices of the first dimension per point
+
+    def __init__(self,
+                 shape: tuple[int, ...],
+                 stride: int,
+                 build: Callable[[int], "NDArray[Any] | SparseTensor"]):
+        assert shape[0] % stride == 0
+        self.shape = shape
+        self.stride = stride
+        self._build = build
+        self._points: dict[int, "NDArray[Any] | SparseTensor"] = {}
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    @property
+    def dtype(self) -> np.dtype[Any]:
+        return self.point(0).dtype
+
+    @property
+    def built_points(self) -> list[int]:
+        """ Sorted list of the points already built """
+        return sorted(self._points)
+
+    def point(self, p: int) -> "NDArray[Any] | SparseTensor":
+        """ Sub-tensor of the p-th random point (of first dimension stride) """
+        if not 0 <= p < self.shape[0] // self.stride:
+            raise IndexError(f"Point {p} out of range for {self.shape[0] // self.stride} random points")
+        try:
+            return self._points[p]
+        except KeyError:
+            tensor = self._points[p] = self._build(p)
+            return tensor
+
+    def __getitem__(self, key: Any) -> NDArray[Any]:
+        if isinstance(key, (int, np.integer)):
+            p, r = divmod(int(key), self.stride)
+            tensor = self.point(p)
+            if isinstance(tensor, np.ndarray):
+                return tensor[r] # View on the stored point
+            return tensor[np.ix_([r], *map(range, self.shape[1:]))][0]
+
+        if not isinstance(key, tuple) or len(key) != self.ndim:
+            raise IndexError("PointwiseTensor only supports integer and np.ix_ open mesh indexing")
+        rest = tuple(np.ravel(k) for k in key[1:])
+        return np.concatenate([
+            self.point(p)[np.ix_([r], *rest)]
+            for p, r in map(lambda i: divmod(int(i), self.stride), np.ravel(key[0]))
+        ])
+
+    def toarray(self) -> NDArray[Any]:
+        """ Dense version of this tensor (builds all the points) """
+        return self[np.ix_(*map(range, self.shape))]
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(shape={self.shape}, stride={self.stride}, built_points={self.built_points})"
+
+
+class TPi3DResult:
+    """
+    Result class of Representation.T_Pi_3D method
+
+    Each variant (Q, QI, QV, ...) is built lazily at its first access and then cached,
+    so that only the variants used by the chosen methods are materialized.
+
+    The random vectors of the random_deep points are drawn at construction so that
+    the variants don't depend on the order in which they are built. The random
+    variants (Q, QI, QI_mod, line_Q) are `PointwiseTensor`: the sub-tensor of a
+    point is only built when the checks reach it, i.e. when they were inconclusive
+    for all the previous points, random_deep being the maximal number of points.
+
+    The tensors are stored according to V.tpi_storage:
+    - dense: numpy arrays,
+    - sparse: `SparseTensor` built from the (src, dst, root) triplets of V.action_U,
+    - memmap: the integer tensors are saved once in a .npy file of V.tpi_dir and then
+      memory-mapped (so that the workers don't recompute them), the symbolic ones are dense.
+    """
+    V: "Representation"
+    random_vectors: NDArray[np.int64] #: Random values of the probabilistic variants
+
+    def __init__(self, V: "Representation"):
+        self.V = V
+        V._manual_seed("T_Pi_3D")
+        rd, dim = V.random_deep, V.dim
+        # produce a collection of 5* random_deep random vectors 
+        self.random_vectors =(-1)**np.random.randint(0,2,size=(5*rd,dim))*np.random.randint(1, 1000, size=(5*rd,dim))
+        # Index 0 used for Q, 1 and 2, for QI (real and imaginary parts), 3,4 for line_Q (a and b for az+b)
+
+    @property
+    def shape(self) -> tuple[int, int, int]:
+        """ Shape of the tensors without the random deepness dimension """
+        return self.V.dim, self.V.dim, self.V.G.dimU
+
+    def _tensor(self, name: str, values: NDArray[Any]) -> "NDArray[Any] | SparseTensor":
+        """ Tensor with the given values on the triplets of V.action_U, stored according to V.tpi_storage """
+        src, dst, root, _ = self.V.action_U
+        shape = values.shape[:-1] + self.shape
+        if self.V.tpi_storage == "sparse":
+            return SparseTensor(shape, src, dst, root, values)
+
+        if self.V.tpi_storage == "memmap" and values.dtype != object:
+            import os
+            file_name = os.path.join(
+                self.V.tpi_dir,
+                f"T_Pi_3D_{type(self.V).__name__}_{self.V._generate_seed('T_Pi_3D'):016x}_{name}.npy"
+            )
+            if not os.path.exists(file_name):
+                result = np.zeros(shape, dtype=values.dtype)
+                result[..., src, dst, root] = values
+                # Atomic creation since workers may concurrently save the same tensor
+                os.makedirs(self.V.tpi_dir, exist_ok=True)
+                tmp_name = f"{file_name}.{os.getpid()}.tmp"
+                with open(tmp_name, "wb") as fh:
+                    np.save(fh, result)
+                os.replace(tmp_name, file_name)
+            return np.load(file_name, mmap_mode="r")
+
+        result = np.zeros(shape, dtype=values.dtype)
+        result[..., src, dst, root] = values
+        return result
+
+    def _random_tensor(self, name: str, *offsets: int) -> PointwiseTensor:
+        """ Tensor filled with the rows 5p + offset of the random vectors (interleaved offsets for each p) """
+        src, dst, root, coef = self.V.action_U
+        return PointwiseTensor(
+            (len(offsets) * self.V.random_deep,) + self.shape,
+            len(offsets),
+            lambda p: self._tensor(f"{name}_{p}", self.random_vectors[5 * p + np.array(offsets)][:, src] * coef),
+        )
+
+    def _symbolic_tensor(self, name: str, variables: NDArray[Any]) -> "NDArray[Any] | SparseTensor":
+        """ Tensor filled with the given symbolic variables """
+        src, dst, root, coef = self.V.action_U
+        values = np.empty(len(src), dtype=object)
+        for i, (s, c) in enumerate(zip(src.tolist(), coef.tolist())):
+            values[i] = c * variables[s]
+        return self._tensor(name, values)
+
+    @cached_property
+    def Q(self) -> PointwiseTensor:
+        return self._random_tensor("Q", 0)
+
+    @cached_property
+    def QI(self) -> PointwiseTensor:
+        """ Real and imaginary parts are interleaved along the first dimension """
+        return self._random_tensor("QI", 1, 2)
+
+    def _QI_mod_point(self, p: int) -> "NDArray[np.uint64] | SparseTensor":
+        from .modular import MODULAR_PRIME, gaussian_mod_p
+        src, dst, root, coef = self.V.action_U
+        point = gaussian_mod_p(self.random_vectors[[5 * p + 1]], self.random_vectors[[5 * p + 2]])
+        return self._tensor(f"QI_mod_{p}", (point[:, src] * coef % MODULAR_PRIME).astype(np.uint64))
+
+    @cached_property
+    def QI_mod(self) -> PointwiseTensor:
+        """
+        Residues modulo MODULAR_PRIME of the QI variant, I being mapped to a square root of -1
+        (see `moment_cone.modular`), with one random point per index of the first dimension
+        """
+        return PointwiseTensor((self.V.random_deep,) + self.shape, 1, self._QI_mod_point)
+
+    @cached_property
+    def QV_int(self) -> "NDArray[np.int8] | SparseTensor":
+        return self._tensor("QV_int", self.V.action_U[3].astype(np.int8))
+
+    @cached_property
+    def line_Q(self) -> PointwiseTensor:
+        """ a and b coefficients of the lines az+b are interleaved along the first dimension """
+        return self._random_tensor("line_Q", 3, 4)
+
+    @cached_property
+    def _variables_QV(self) -> NDArray[Any]:
+        variables = np.empty(self.V.dim, dtype=object)
+        for id_chi, chi in enumerate(self.V.all_weights):
+            variables[id_chi] = self.V.QV.variable(chi)
+        return variables
+
+    @cached_property
+    def _variables_line_QV(self) -> NDArray[Any]:
+        K=self.V.QV2.fraction_field()
+        ring_R0 = PolynomialRing(K,"z")
+        variables = np.empty(self.V.dim, dtype=object)
+        for id_chi, chi in enumerate(self.V.all_weights):
+            vchi_a, vchi_b = self.V.QV2.variable(chi)
+            variables[id_chi] = vchi_a*ring_R0('z') + vchi_b
+        return variables
+
+    @cached_property
+    def QV(self) -> "NDArray[Any] | SparseTensor":
+        return self._symbolic_tensor("QV", self._variables_QV)
+
+    @cached_property
+    def line_QV(self) -> "NDArray[Any] | SparseTensor":
+        return self._symbolic_tensor("line_QV", self._variables_line_QV)
+
+    @cached_property
+    def dict_Q(self) -> list[dict[Polynomial, Polynomial]]:
+        """ Evaluation of the variables along the random lines (only for the weights with a non-zero action) """
+        V = self.V
+        src = V.action_U[0]
+        has_action = np.zeros(V.dim, dtype=bool)
+        has_action[src] = True
+        homs_Q=[]
+        for p in range(V.random_deep):
+            subs_Q = [
+                self.random_vectors[5*p+3,id_chi]*V.QZ('z')+self.random_vectors[5*p+4,id_chi] if has_action[id_chi] else 1
+                for id_chi in range(V.dim)
+            ]
+            homs_Q.append(V.QV.hom(subs_Q,V.QZ.sage_ring))
+        return homs_Q
+
+    @cached_property
+    def dict_QV(self) -> list[dict[Polynomial, Polynomial]]: # FIXME: name and type is not correct anymore
+        return [dict(zip(self._variables_QV, self._variables_line_QV))]
+
+    def is_built(self, method: Method, kind: Optional[Literal["imaginary", "line", "dict"]] = None) -> bool:
+        """ Check if the given variant has already been built """
+        return self._variant_name(method, kind) in self.__dict__
+
+    @staticmethod
+    def _variant_name(method: Method, kind: Optional[Literal["imaginary", "line", "dict"]] = None) -> str:
+        """ Name of the attribute storing the given variant """
+        match kind, method:
+            case None, 'probabilistic': return "Q"
+            case 'imaginary', 'probabilistic': return "QI"
+            case 'imaginary', 'modular': return "QI_mod"
+            case None | 'imaginary', 'symbolic': return "QV"
+            case None, 'symbolic_int': return "QV_int"
+            case 'line', 'probabilistic': return "line_Q"
+            case 'line', 'symbolic': return "line_QV"
+            case 'dict', 'probabilistic': return "dict_Q"
+            case 'dict', 'symbolic': return "dict_QV"
+            case _: raise ValueError(f"Unknown method {method} and kind {kind}")
 
     @overload
     def __call__(
             self,
             method: Method,
             kind: Optional[Literal["imaginary", "line"]] = None,
-        ) -> NDArray[Any]:
+        ) -> "NDArray[Any] | SparseTensor | PointwiseTensor":
         ...
     
     @overload
@@ -53,17 +414,11 @@ class TPi3DResult(NamedTuple):
             self,
             method: Method,
             kind: Optional[Literal["imaginary", "line", "dict"]] = None,
-        ) -> NDArray[Any] | list[dict[Polynomial, Polynomial]]:
-        match kind, method:
-            case None, 'probabilistic': return self.Q
-            case 'imaginary', 'probabilistic': return self.QI
-            case None | 'imaginary', 'symbolic': return self.QV
-            case None, 'symbolic_int': return self.QV_int
-            case 'line', 'probabilistic': return self.line_Q
-            case 'line', 'symbolic': return self.line_QV
-            case 'dict', 'probabilistic': return self.dict_Q
-            case 'dict', 'symbolic': return self.dict_QV
-            case _: raise ValueError(f"Unknown method {method} and kind {kind}")
+        ) -> "NDArray[Any] | SparseTensor | PointwiseTensor | list[dict[Polynomial, Polynomial]]":
+        return cast(
+            "NDArray[Any] | SparseTensor | PointwiseTensor | list[dict[Polynomial, Polynomial]]",
+            getattr(self, self._variant_name(method, kind))
+        )
 
     
 class Representation(ABC):
@@ -77,12 +432,16 @@ class Representation(ABC):
     G: LinearGroup
     random_deep: int #: Deepness of the probabilistic methods
     seed: int #: Seed for the pseudo-random generators
+    tpi_storage: TPiStorage #: Storage of the tensors returned by T_Pi_3D
+    tpi_dir: str #: Directory of the memory-mapped T_Pi_3D tensors
 
     def __new__(cls: type[Self], 
                 G: LinearGroup | Iterable[int],
                 *,
                 random_deep: int = 1,
                 seed: Optional[int] = None,
+                tpi_storage: TPiStorage = "dense",
+                tpi_dir: Optional[str] = None,
                 extra: Optional[Hashable] = None) -> Self:
         """ Custom instance construction in order to reuse previous instance """
         if not isinstance(G, LinearGroup):
@@ -92,8 +451,11 @@ class Representation(ABC):
         from .utils import generate_seed
         seed = generate_seed(seed)
 
+        if not tpi_dir:
+            tpi_dir = _default_tpi_dir() if tpi_storage == "memmap" else ""
+
         # Get or create unique instance
-        self_keys = (cls.__name__, tuple(G), seed, random_deep, extra)
+        self_keys = (cls.__name__, tuple(G), seed, random_deep, tpi_storage, tpi_dir, extra)
         try:
             self = cls.__all_instances[self_keys]
         except KeyError:
@@ -101,6 +463,8 @@ class Representation(ABC):
             self.G = G
             self.random_deep = random_deep
             self.seed = seed
+            self.tpi_storage = tpi_storage
+            self.tpi_dir = tpi_dir
             cls.__all_instances[self_keys] = self
         return self
     
@@ -183,6 +547,8 @@ class Representation(ABC):
         kwargs: dict[str, Any] = dict(
             random_deep=self.random_deep,
             seed=self.seed,
+            tpi_storage=self.tpi_storage,
+            tpi_dir=self.tpi_dir,
         )
         kwargs.update(extra)
         return type(self)(
@@ -196,6 +562,8 @@ class Representation(ABC):
             G=self.G,
             random_deep=self.random_deep,
             seed=self.seed,
+            tpi_storage=self.tpi_storage,
+            tpi_dir=self.tpi_dir,
         )
 
     def __getstate__(self) -> dict[str, Any]:
@@ -204,6 +572,8 @@ class Representation(ABC):
             G=self.G,
             random_deep=self.random_deep,
             seed=self.seed,
+            tpi_storage=self.tpi_storage,
+            tpi_dir=self.tpi_dir,
         )
     
     def __setstate__(self, state: dict[str, Any]) -> None:
@@ -211,6 +581,8 @@ class Representation(ABC):
         self.G = state["G"]
         self.random_deep = state["random_deep"]
         self.seed = state["seed"]
+        self.tpi_storage = state["tpi_storage"]
+        self.tpi_dir = state["tpi_dir"]
 
     def weight(self, *args: Any, **kwargs: Any) -> WeightBase:
         """ Creates a weight for the given representation """
@@ -232,6 +604,13 @@ class Representation(ABC):
         """
         ...
 
+    def indices_of_weights(self, weights: Iterable[WeightBase]) -> NDArray[np.intp]:
+        """ Batched version of `index_of_weight` returning an array of indices """
+        return np.fromiter(
+            (self.index_of_weight(chi) for chi in weights),
+            dtype=np.intp,
+        )
+
     @cached_property
     @abstractmethod
     def dim_cone(self) -> int:
@@ -256,6 +635,17 @@ class Representation(ABC):
 
     @cached_property
     @abstractmethod
+    def action_U(self) -> tuple[NDArray[np.intp], NDArray[np.intp], NDArray[np.intp], NDArray[np.int64]]:
+        """
+        Sparse action of the roots of U on the basis of V.
+
+        Returns four arrays (src, dst, root, coef) of same length such that
+        E_root v_src = coef v_dst where root is indexed as in `Root.all_of_U`
+        and the weights as in `all_weights`. All other actions are zero.
+        """
+        ...
+
+    @cached_property
     def T_Pi_3D(self) -> TPi3DResult:
         """
         The list of matrices rho_V(xi) for xi in the bases of K as a tridimensional np.array.
@@ -265,7 +655,7 @@ class Representation(ABC):
         The result of this property is cached and is computer from random numbers.
         If you need to get new random elements, call `clear_T_Pi_3D` method before.
         """
-    ...
+        return TPi3DResult(self)
 
     def clear_T_Pi_3D(self) -> None:
         """ Clear cache of T_Pi_3D property """
@@ -288,11 +678,50 @@ class Representation(ABC):
                 
 
     @abstractmethod
+    def root_edges(self, alpha: Root) -> tuple[NDArray[np.int64], NDArray[np.int64]]:
+        """
+        Edges (sources, targets) of the graph of the root alpha, as index arrays in self.all_weights
+
+        An edge j -> i means that the root alpha sends the weight j to the weight i.
+        """
+        ...
+
+    @cached_property
+    def roots_adjacency(self) -> dict[Root, tuple[NDArray[np.int64], NDArray[np.int64]]]:
+        """
+        Edges of the graph of each root (see `root_edges`), computed once per representation
+
+        Precomputed for the roots of U, completed on demand for the other roots.
+        """
+        return {alpha: self.root_edges(alpha) for alpha in Root.all_of_U(self.G)}
+
+    def graph_edges(self, roots: Iterable[Root]) -> tuple[NDArray[np.int64], NDArray[np.int64]]:
+        """
+        Edges (sources, targets) of the graph of the given roots, without duplicates
+
+        It is the sparse version of Matrix_Graph: the edge j -> i corresponds
+        to the non-zero entry (i, j) of the matrix.
+        """
+        adjacency = self.roots_adjacency
+        edges = []
+        for alpha in roots:
+            if alpha not in adjacency:
+                adjacency[alpha] = self.root_edges(alpha)
+            edges.append(adjacency[alpha])
+        if len(edges) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        sources = np.concatenate([e[0] for e in edges])
+        targets = np.concatenate([e[1] for e in edges])
+        keys = np.unique(sources * self.dim + targets)
+        return keys // self.dim, keys % self.dim
+
     def Matrix_Graph(self, roots: Iterable[Root]) -> Matrix:
         """
         Return the matrix of the graph indexed by self.all_weights
         """
-        ...
+        from .rings import matrix, ZZ
+        sources, targets = self.graph_edges(roots)
+        return matrix(ZZ, self.dim, self.dim, {(int(i), int(j)): 1 for i, j in zip(targets, sources)}, sparse=False)
     
     def __repr__(self) -> str:
         return f"{type(self).__name__}(G={self.G})"
@@ -369,6 +798,7 @@ class Representation(ABC):
     def add_arguments(parent_parser: ArgumentParser, defaults: Mapping[str, Any] = {}) -> None:
         """ Add command-line arguments that defines the representation """
         from .utils import to_literal
+        from typing import get_args
         group = parent_parser.add_argument_group(
             "Representation"
         )
@@ -400,7 +830,20 @@ class Representation(ABC):
             "--random_deep",
             type=int,
             default=1,
-            help="Deepness of the check for probabilistic methods",
+            help="Maximal number of random points of the probabilistic methods (the tensors of a point are only built if the check is inconclusive at all the previous points)",
+        )
+        group.add_argument(
+            "--tpi_storage",
+            type=lambda s: to_literal(TPiStorage, s),
+            choices=get_args(TPiStorage),
+            default="dense",
+            help="Storage of the T_Pi_3D tensors (sparse: triplets of the action of the roots, memmap: dense tensors saved in .npy files and memory-mapped by the workers)",
+        )
+        group.add_argument(
+            "--tpi_dir",
+            type=str,
+            default=None,
+            help="Directory of the .npy files of the memmap storage (default to a temporary directory removed at exit)",
         )
 
     @classmethod
@@ -413,6 +856,8 @@ class Representation(ABC):
             G=G,
             random_deep=config.random_deep,
             seed=config.seed,
+            tpi_storage=config.tpi_storage,
+            tpi_dir=config.tpi_dir,
         )
         specific_args: dict[str, Any] = {}
         repr_class: type[Representation]
@@ -489,11 +934,40 @@ class KroneckerRepresentation(Representation):
         if not use_internal_index or chi.index is None:
             if not isinstance(chi, WeightAsList):
                 raise ValueError("Invalid weight representation")        
-            from operator import mul
-            stride = itertools.accumulate(reversed(self.G[1:]), mul, initial=1)
-            chi.index = sum(v * s for v, s in zip(reversed(chi.as_list), stride))
+            chi.index = int(np.dot(chi.as_list, self.weight_strides))
         return chi.index
 
+    def indices_of_weights(self, weights: Iterable[WeightBase]) -> NDArray[np.intp]:
+        """
+        Batched version of `index_of_weight` using the stride vector
+
+        >>> V = KroneckerRepresentation((2, 3, 4, 1))
+        >>> V.indices_of_weights([V.all_weights[5], V.all_weights[17], V.all_weights[0]])
+        array([ 5, 17,  0])
+        """
+        coords = np.array([chi.as_list for chi in weights], dtype=np.intp).reshape(-1, len(self.G))
+        return coords @ self.weight_strides
+
+    @cached_property
+    def weight_strides(self) -> NDArray[np.intp]:
+        """
+        Stride vector so that the index of a weight is the dot product with its coordinates
+
+        >>> KroneckerRepresentation((2, 3, 4, 1)).weight_strides
+        array([12,  4,  1,  1])
+        """
+        strides = np.ones(len(self.G), dtype=np.intp)
+        strides[:-1] = np.cumprod(self.G[:0:-1])[::-1]
+        strides.flags.writeable = False
+        return strides
+
+    @cached_property
+    def weights_coordinates(self) -> NDArray[np.intp]:
+        """ Coordinates of all the weights as a (dim, len(G)) array (same order as `all_weights`) """
+        coords = np.indices(self.G, dtype=np.intp).reshape(len(self.G), -1).T
+        coords.flags.writeable = False
+        return coords
+
     @property
     def weights_mod_outer(self) -> Iterable[WeightAsList]:
         """
@@ -527,68 +1001,31 @@ class KroneckerRepresentation(Representation):
             ) # Summing tuples is concatenating them 
     
     @cached_property
-    def T_Pi_3D(self) -> TPi3DResult:
-        """
-        The list of matrices rho_V(xi) for xi in the bases of K as a tridimensional np.array.
-        The first entry are indexed by all_rootsK using the dictionary dict_rootK of the class LinearGroup.
-        The other entries are indexed by self.all_Weights using self.index_of_weight(chi).
+    def action_U(self) -> tuple[NDArray[np.intp], NDArray[np.intp], NDArray[np.intp], NDArray[np.int64]]:
         """
-        from .utils import manual_seed
-        self._manual_seed("T_Pi_3D")
-
-        # Computation made once
-        result_Q = np.zeros((self.random_deep,self.dim, self.dim, self.G.dimU), dtype=np.int64)
-        result_QI = np.zeros((2*self.random_deep,self.dim, self.dim, self.G.dimU), dtype=np.int64) #first index is used for real and imaginary part.
-        result_QV = np.zeros((self.dim, self.dim, self.G.dimU), dtype=object)
-        result_QV_int = np.zeros((self.dim, self.dim, self.G.dimU), dtype=np.int8)
-        result_line_Q = np.zeros((2*self.random_deep,self.dim, self.dim, self.G.dimU), dtype=np.int64)
-        result_line_QV = np.zeros((self.dim, self.dim, self.G.dimU), dtype=object)
-        
-        K=self.QV2.fraction_field()
-        ring_R0 = PolynomialRing(K,"z")
-        dict_Q: list[dict[Polynomial, Polynomial]] = [{} for _ in range(self.random_deep)]
-        #dict_QV: list[dict[Polynomial, Polynomial]] = [{} for _ in range(self.random_deep)]
-        dict_QV: list[dict[Polynomial, Polynomial]] = [{}]
-        # produce a collection of 5* random_deep random vectors 
-        random_vectors =(-1)**np.random.randint(0,2,size=(5*self.random_deep,self.dim))*np.random.randint(1, 1000, size=(5*self.random_deep,self.dim))
-        # Index 0 used for Q, 1 and 2, for QI (real and imaginary parts), 3,4 for line_Q (a and b for az+b)
+        Sparse action of the roots of U on the basis of V (see `Representation.action_U`).
 
-        for chi in self.all_weights:
-            id_chi=self.index_of_weight(chi)
-            vchi_a, vchi_b = self.QV2.variable(chi)
-            #dict_QV[0][self.QV.variable(chi)]= vchi_a*ring_R0('z') + vchi_b # type: ignore
-            #homs_QV[0][self.QV.variable(chi)]= vchi_a*ring_R0('z') + vchi_b # type: ignore
-            #_QV.append(vchi_a*ring_R0('z') + vchi_b)#coucou
-            dict_QV[0][self.QV.variable(chi)]=vchi_a*ring_R0('z') + vchi_b # type: ignore
-            for k,b in enumerate(chi.as_list):
-                for i in range(b):
-                    chi_i = WeightAsList(
-                        self.G,
-                        as_list=chi.as_list[:k] + (i,) + chi.as_list[k+1:]
-                        )
-                    id_i = self.index_of_weight(chi_i)
-                    for p in range(self.random_deep):
-                        result_Q[p,id_chi,id_i,Root(k,i,b).index_in_all_of_U(self.G)] = random_vectors[5*p,id_chi]
-                        result_QI[2*p,id_chi,id_i,Root(k,i,b).index_in_all_of_U(self.G)] = random_vectors[5*p+1,id_chi]
-                        result_QI[2*p+1,id_chi,id_i,Root(k,i,b).index_in_all_of_U(self.G)] = random_vectors[5*p+2,id_chi]
-                        result_QV[id_chi,id_i,Root(k,i,b).index_in_all_of_U(self.G)] = self.QV.variable(chi)
-                        result_QV_int[id_chi,id_i,Root(k,i,b).index_in_all_of_U(self.G)] = 1
-                        result_line_Q[2*p,id_chi,id_i,Root(k,i,b).index_in_all_of_U(self.G)] = random_vectors[5*p+3,id_chi]
-                        result_line_Q[2*p+1,id_chi,id_i,Root(k,i,b).index_in_all_of_U(self.G)] = random_vectors[5*p+4,id_chi]
-                        dict_Q[p][self.QV.variable(chi)]= random_vectors[5*p+3,id_chi]*self.QZ('z')+random_vectors[5*p+4,id_chi]
-                        result_line_QV[id_chi,id_i,Root(k,i,b).index_in_all_of_U(self.G)] = vchi_a*ring_R0('z') + vchi_b
+        E^k_ib maps the weight chi with chi[k] = b to the weight with chi[k] = i.
 
-        homs_Q=[]
-        for p in range(self.random_deep):
-            subs_Q = [dict_Q[p].get(self.QV.variable(chi),1) for chi in self.all_weights]
-            homs_Q.append(self.QV.hom(subs_Q,self.QZ.sage_ring))
-        #homs_QV=[self.QV.hom(subs_Q,self.QV2.sage_ring)] # List of length one since in deterministic case non need of repetition    
-        return TPi3DResult(
-            result_Q, result_QI, result_QV, result_QV_int,
-            result_line_Q, result_line_QV,
-            homs_Q, dict_QV
-        )
-    
+        >>> V = KroneckerRepresentation((2, 2, 1))
+        >>> src, dst, root, coef = V.action_U
+        >>> sorted(zip(src.tolist(), dst.tolist(), root.tolist()))
+        [(1, 0, 1), (2, 0, 0), (3, 1, 0), (3, 2, 1)]
+        """
+        coords = self.weights_coordinates
+        table = self.G.U_index_table
+        src_l = [np.empty(0, dtype=np.intp)]
+        dst_l = [np.empty(0, dtype=np.intp)]
+        root_l = [np.empty(0, dtype=np.intp)]
+        for k, dk in enumerate(self.G):
+            for b in range(1, dk):
+                src_b = np.flatnonzero(coords[:, k] == b)
+                for i in range(b):
+                    src_l.append(src_b)
+                    dst_l.append(src_b - (b - i) * self.weight_strides[k])
+                    root_l.append(np.full_like(src_b, table[k, i, b]))
+        src = np.concatenate(src_l)
+        return src, np.concatenate(dst_l), np.concatenate(root_l), np.ones(len(src), dtype=np.int64)
     
     @cached_property
     def actionK(self) -> NDArray[Any]:
@@ -632,29 +1069,26 @@ class KroneckerRepresentation(Representation):
         return(result)            
     
 
-    def Matrix_Graph(self, roots : Iterable[Root]) -> Matrix:
+    def root_edges(self, alpha: Root) -> tuple[NDArray[np.int64], NDArray[np.int64]]:
         """
-        Return the matrix of the graph indexed by self.all_weights
+        Edges (sources, targets) of the graph of the root alpha, as index arrays in self.all_weights
         """
-        from .rings import matrix, ZZ
-
-        M = matrix(ZZ,self.dim,self.dim)
-        for alpha in roots:
-            Gred = LinearGroup(self.G[:alpha.k ] +self.G[alpha.k+1:])
-            Vred = self.reduce(Gred)
-            for w in Vred.all_weights:
-                wj = WeightAsList(
-                    self.G,
-                    as_list=w.as_list[:alpha.k] + (alpha.j,) + w.as_list[alpha.k:]
-                )
-                idj = self.index_of_weight(wj)                   
-                wi = WeightAsList(
-                    self.G,
-                    as_list=w.as_list[:alpha.k] + (alpha.i,) + w.as_list[alpha.k:]
-                )
-                idi = self.index_of_weight(wi)
-                M[idi, idj]=1
-        return M
+        sources: list[int] = []
+        targets: list[int] = []
+        Gred = LinearGroup(self.G[:alpha.k ] +self.G[alpha.k+1:])
+        Vred = self.reduce(Gred)
+        for w in Vred.all_weights:
+            wj = WeightAsList(
+                self.G,
+                as_list=w.as_list[:alpha.k] + (alpha.j,) + w.as_list[alpha.k:]
+            )
+            sources.append(self.index_of_weight(wj))
+            wi = WeightAsList(
+                self.G,
+                as_list=w.as_list[:alpha.k] + (alpha.i,) + w.as_list[alpha.k:]
+            )
+            targets.append(self.index_of_weight(wi))
+        return np.array(sources, dtype=np.int64), np.array(targets, dtype=np.int64)
 
 
 class ParticleRepresentation(Representation):
@@ -795,43 +1229,68 @@ class ParticleRepresentation(Representation):
         return(result)                    
 
     @cached_property
-    def T_Pi_3D(self) -> TPi3DResult:
+    def _weight_indices(self) -> dict[tuple[int, ...], int]:
+        """ Lookup table from the sorted list of particles of a weight to its index """
+        return {
+            tuple(sorted(chi.as_list_of_list[0])): idx
+            for idx, chi in enumerate(self.all_weights)
+        }
+
+    def _particle_keys(self, particles: Iterable[Sequence[int]]) -> NDArray[Any]:
+        """ Integer keys of the sorted lists of particles (digits in base G.rank) """
+        # Keys exceeding int64 are computed with Python integers
+        dtype = np.int64 if self.G.rank ** self.particle_cnt < 2**63 else object
+        coords = np.sort(np.array(list(particles), dtype=np.intp).reshape(-1, self.particle_cnt), axis=1)
+        keys = np.zeros(len(coords), dtype=dtype)
+        for j in range(self.particle_cnt):
+            keys = keys * self.G.rank + coords[:, j].astype(dtype)
+        return keys
+
+    @cached_property
+    def _weight_keys(self) -> tuple[NDArray[Any], NDArray[np.intp]]:
+        """ Keys of all_weights (see `_particle_keys`) and the permutation that sorts them """
+        keys = self._particle_keys(chi.as_list_of_list[0] for chi in self.all_weights)
+        return keys, np.argsort(keys, kind="stable")
+
+    def indices_of_weights(self, weights: Iterable[WeightBase]) -> NDArray[np.intp]:
         """
-        The list of matrices rho_V(xi) for xi in the bases of K as a tridimensional np.array.
-        The first entry are indexed by all_rootsK using the dictionary dict_rootK of the class LinearGroup.
-        The other entries are indexed by self.all_Weights using self.index_of_weight(chi).
+        Batched version of `index_of_weight` by binary search of the particle keys
+
+        >>> V = BosonRepresentation((3,), particle_cnt=2)
+        >>> V.indices_of_weights([V.all_weights[4], V.all_weights[1], V.all_weights[4]])
+        array([4, 1, 4])
         """
-        from .utils import manual_seed
-        self._manual_seed("T_Pi_3D")
-
-        # Computation made once
-        result_Q = np.zeros((self.random_deep,self.dim, self.dim, self.G.dimU), dtype=np.int64)
-        result_QI = np.zeros((2*self.random_deep,self.dim, self.dim, self.G.dimU), np.int64)
-        result_QV = np.zeros((self.dim, self.dim, self.G.dimU), dtype=object)
-        result_QV_int = np.zeros((self.dim, self.dim, self.G.dimU), dtype=np.int8)
-        result_line_Q = np.zeros((2*self.random_deep,self.dim, self.dim, self.G.dimU), dtype=np.int16)
-        result_line_QV = np.zeros((self.dim, self.dim, self.G.dimU), dtype=object)        
-        K=self.QV2.fraction_field()
-        ring_R0 = PolynomialRing(K,"z")
-        dict_Q: list[dict[Polynomial, Polynomial]] = [{} for _ in range(self.random_deep)]
-        dict_QV=[{}]  # type: ignore 
-        
-        
-        # produce a collection of 5* random_deep random vectors 
-        random_vectors =(-1)**np.random.randint(0,2,size=(5*self.random_deep,self.dim))*np.random.randint(1, 1000, size=(5*self.random_deep,self.dim))
-        # Index 0 used for Q, 1 and 2, for QI (real and imaginary parts), 3,4 for line_Q (a and b for az+b)
+        particles: list[Sequence[int]] = []
+        for chi in weights:
+            if not isinstance(chi, WeightAsListOfList):
+                raise ValueError("Invalid weight representation")
+            particles.append(chi.as_list_of_list[0])
+        keys, order = self._weight_keys
+        query = self._particle_keys(particles)
+        indices = order[np.minimum(np.searchsorted(keys, query, sorter=order), len(keys) - 1)]
+        if not np.array_equal(keys[indices], query):
+            raise ValueError("Invalid weight for this representation")
+        return indices
 
-        for chi in self.all_weights:
-            id_chi=self.index_of_weight(chi)
-            vchi_a, vchi_b = self.QV2.variable(chi)
-            dict_QV[0][self.QV.variable(chi)]=vchi_a*ring_R0('z') + vchi_b
+    @cached_property
+    def action_U(self) -> tuple[NDArray[np.intp], NDArray[np.intp], NDArray[np.intp], NDArray[np.int64]]:
+        """
+        Sparse action of the roots of U on the basis of V (see `Representation.action_U`).
+        """
+        table = self.G.U_index_table
+        weight_indices = self._weight_indices
+        src: list[int] = []
+        dst: list[int] = []
+        root: list[int] = []
+        coef: list[int] = []
+        for id_chi, chi in enumerate(self.all_weights):
             for k,b in enumerate(chi.as_list_of_list[0]):
                 index_b = chi.as_list_of_list[0].index(b) #Used to treat repritions in the bosonic case
                 if k == index_b:
                     mult = chi.as_list_of_list[0].count(b) #Constant obtained by derivative
                     # ssplit chi 
-                    L1 = chi.as_list_of_list[0][:index_b]
-                    L2 = chi.as_list_of_list[0][index_b+1:]
+                    L1 = tuple(chi.as_list_of_list[0][:index_b])
+                    L2 = tuple(chi.as_list_of_list[0][index_b+1:])
                     for i in range(b):
                         if isinstance(self, BosonRepresentation) or i not in L1: # otherwise action is zero
                             L3 = tuple(sorted(L1 + (i,)))
@@ -840,38 +1299,23 @@ class ParticleRepresentation(Representation):
                                 dec=0
                             else :
                                 dec=len(L3)-L3.index(i)-1
-                            Li=L3+L2
-                            chi_i = WeightAsListOfList(self.G, as_list_of_list=[Li])
-                            id_i = self.index_of_weight(chi_i)
-                            for p in range(self.random_deep):
-                                result_Q[p,id_chi,id_i,Root(0,i,b).index_in_all_of_U(self.G)] = mult* (-1)**dec*random_vectors[5*p,id_chi]
-                                result_QI[2*p,id_chi,id_i,Root(0,i,b).index_in_all_of_U(self.G)] = mult*(-1)**dec*random_vectors[5*p+1,id_chi]
-                                result_QI[2*p+1,id_chi,id_i,Root(0,i,b).index_in_all_of_U(self.G)] = mult*(-1)**dec*random_vectors[5*p+2,id_chi]
-                                result_QV[id_chi,id_i,Root(0,i,b).index_in_all_of_U(self.G)] = mult* (-1)**dec*self.QV.variable(chi)
-                                result_QV_int[id_chi,id_i,Root(0,i,b).index_in_all_of_U(self.G)] = mult* (-1)**dec
-                                result_line_Q[2*p,id_chi,id_i,Root(0,i,b).index_in_all_of_U(self.G)] = mult* (-1)**dec*random_vectors[5*p+3,id_chi]  #(va[id_chi]*self.QZ('z')+vb[id_chi])
-                                result_line_Q[2*p+1,id_chi,id_i,Root(0,i,b).index_in_all_of_U(self.G)] = mult* (-1)**dec*random_vectors[5*p+4,id_chi]
-                                dict_Q[p][self.QV.variable(chi)] = random_vectors[5*p+3,id_chi]*self.QZ('z')+random_vectors[5*p+4,id_chi]
-                                result_line_QV[id_chi,id_i,Root(0,i,b).index_in_all_of_U(self.G)] = mult* (-1)**dec*(vchi_a*ring_R0('z') + vchi_b)
-        homs_Q=[]
-        for p in range(self.random_deep):
-            subs_Q = [dict_Q[p].get(self.QV.variable(chi),1) for chi in self.all_weights]
-            homs_Q.append(self.QV.hom(subs_Q,self.QZ.sage_ring))
-        #homs_QV=[self.QV.hom(subs_Q,self.QV2.sage_ring)]    
-        return TPi3DResult(
-            result_Q, result_QI, result_QV,result_QV_int,
-            result_line_Q, result_line_QV,
-            homs_Q, dict_QV
+                            src.append(id_chi)
+                            dst.append(weight_indices[L3 + L2])
+                            root.append(table[0, i, b])
+                            coef.append(mult * (-1)**dec)
+        return (
+            np.array(src, dtype=np.intp),
+            np.array(dst, dtype=np.intp),
+            np.array(root, dtype=np.intp),
+            np.array(coef, dtype=np.int64),
         )
-      
 
-    def Matrix_Graph(self, roots : Iterable[Root]) -> Matrix:
+    def root_edges(self, alpha: Root) -> tuple[NDArray[np.int64], NDArray[np.int64]]:
         """
-        Return the matrix of the graph indexed by self.all_weights
+        Edges (sources, targets) of the graph of the root alpha, as index arrays in self.all_weights
         """
-        from .rings import matrix, ZZ
-
-        M = matrix(ZZ,self.dim,self.dim)
+        sources: list[int] = []
+        targets: list[int] = []
 
         if isinstance(self, FermionRepresentation):
             shiftrank = 1
@@ -883,23 +1327,18 @@ class ParticleRepresentation(Representation):
             particle_cnt=self.particle_cnt - 1,
         )
 
-        for alpha in roots:
-            for w in Vred.all_weights: 
-                L1=[s for s in w.as_list_of_list[0] if s<alpha.j]                
-                L2=[s+shiftrank for s in w.as_list_of_list[0] if s>=alpha.j]
-                lj=L1+[alpha.j]+L2  # we insert j
-                if isinstance(self, BosonRepresentation) or alpha.i not in lj: # Otherwise E_ij v =0
-                    wj  = WeightAsListOfList(self.G,as_list_of_list=[lj])
-                    idj = self.index_of_weight(wj)
-                    li=L1+[alpha.i]+L2  # we insert i
-                    li.sort()
-                    wi = WeightAsListOfList(self.G,as_list_of_list=[li])
-                    idi = self.index_of_weight(wi)
-                    if isinstance(self, FermionRepresentation):
-                        M[idi, idj] = 1
-                    else :
-                        M[idi, idj] = 1
-        return M
+        for w in Vred.all_weights: 
+            L1=[s for s in w.as_list_of_list[0] if s<alpha.j]                
+            L2=[s+shiftrank for s in w.as_list_of_list[0] if s>=alpha.j]
+            lj=L1+[alpha.j]+L2  # we insert j
+            if isinstance(self, BosonRepresentation) or alpha.i not in lj: # Otherwise E_ij v =0
+                wj  = WeightAsListOfList(self.G,as_list_of_list=[lj])
+                sources.append(self.index_of_weight(wj))
+                li=L1+[alpha.i]+L2  # we insert i
+                li.sort()
+                wi = WeightAsListOfList(self.G,as_list_of_list=[li])
+                targets.append(self.index_of_weight(wi))
+        return np.array(sources, dtype=np.int64), np.array(targets, dtype=np.int64)
 
     def __repr__(self) -> str:
         return f"{type(self).__name__}(G={self.G}, particle_cnt={self.particle_cnt})"
@@ -984,10 +1423,6 @@ class BosonRepresentation(ParticleRepresentation):
             raise ValueError("Invalid weight representation")
         
         if not use_internal_index or chi.index is None:
-            for i, chi2 in enumerate(self.all_weights):
-                if chi2.as_vector == chi.as_vector :
-                    chi.index = i
-                    break
-            assert chi.index is not None
-            
+            chi.index = self._weight_indices[tuple(sorted(chi.as_list_of_list[0]))]
+
         return chi.index
@@ -3,7 +3,10 @@ __all__ = (
 )
 
 from dataclasses import dataclass
+import functools
 import itertools
+import numpy as np
+from numpy.typing import NDArray
 
 from .rings import Vector
 from .linear_group import LinearGroup
@@ -80,6 +83,71 @@ class Root:
         tot = sum((x * (x - 1)) // 2 for x in G[:self.k])
         return tot + (G[self.k] - self.i - 1) * self.i + (self.i * (self.i + 1)) // 2 + self.j - self.i - 1
     
+    @staticmethod
+    def indices_in_all_of_U(roots: Iterable["Root"], G: LinearGroup) -> NDArray[np.intp]:
+        """
+        Batched version of `index_in_all_of_U` using the lookup table of the group
+
+        >>> G = LinearGroup((2, 3, 4))
+        >>> Root.indices_in_all_of_U([Root(1, 1, 2), Root(0, 0, 1), Root(2, 2, 3)], G)
+        array([3, 0, 9])
+
+        Roots that are not in U raise a ValueError (instead of a -1 index):
+
+        >>> Root.indices_in_all_of_U([Root(1, 2, 1)], G)
+        Traceback (most recent call last):
+        ...
+        ValueError: Roots not in U of G: [Root(k=1, i=2, j=1)]
+        """
+        return _lookup_roots(G.U_index_table, list(roots), "U of G")
+
+    @staticmethod
+    def mask_of_U(roots: Iterable["Root"], G: LinearGroup) -> int:
+        """
+        Encodes a set of roots of U as an integer bitmask
+        
+        The bit of index i is set if the i-th root of `all_of_U` is in the set.
+
+        >>> G = LinearGroup((2, 3))
+        >>> bin(Root.mask_of_U([Root(0, 0, 1), Root(1, 1, 2)], G))
+        '0b1001'
+        """
+        mask = 0
+        for root in roots:
+            mask |= 1 << root.index_in_all_of_U(G)
+        return mask
+
+    @staticmethod
+    def from_mask_of_U(mask: int, G: LinearGroup) -> tuple["Root", ...]:
+        """
+        Decodes a bitmask of roots of U (see `mask_of_U`)
+
+        Roots are returned in the order of `all_of_U`.
+
+        >>> G = LinearGroup((2, 3))
+        >>> Root.from_mask_of_U(0b1001, G)
+        (Root(k=0, i=0, j=1), Root(k=1, i=1, j=2))
+        """
+        roots = _all_of_U_tuple(G)
+        return tuple(roots[i] for i in Root.indices_from_mask(mask))
+
+    @staticmethod
+    def indices_from_mask(mask: int) -> NDArray[np.intp]:
+        """
+        Returns the sorted indices of the set bits of a bitmask as a numpy array
+
+        Suitable for the indexing of numpy arrays (e.g. with `np.ix_`).
+
+        >>> Root.indices_from_mask(0b101100)
+        array([2, 3, 5])
+        >>> Root.indices_from_mask(0)
+        array([], dtype=int64)
+        """
+        if mask == 0:
+            return np.empty(0, dtype=np.intp)
+        raw = np.frombuffer(mask.to_bytes((mask.bit_length() + 7) // 8, "little"), dtype=np.uint8)
+        return np.flatnonzero(np.unpackbits(raw, bitorder="little"))
+
 
     @staticmethod
     def all_of_B(G: LinearGroup) -> Iterable["Root"]:
@@ -132,6 +200,17 @@ class Root:
         tot=sum(x**2 for x in G[:self.k])
         return tot+G[self.k]*self.i+self.j
     
+    @staticmethod
+    def indices_in_all_of_K(roots: Iterable["Root"], G: LinearGroup) -> NDArray[np.intp]:
+        """
+        Batched version of `index_in_all_of_K` using the lookup table of the group
+
+        >>> G = LinearGroup((2, 3, 4))
+        >>> Root.indices_in_all_of_K([Root(1, 2, 0), Root(0, 1, 1), Root(2, 3, 3)], G)
+        array([10,  3, 28])
+        """
+        return _lookup_roots(G.K_index_table, list(roots), "K of G")
+
     @staticmethod
     def all(G: LinearGroup) -> Iterable["Root"]:
         """
@@ -198,3 +277,28 @@ class Root:
     @property
     def as_list(self) -> list[int]:
         return [self.k,self.i,self.j]
+
+
+@functools.cache
+def _all_of_U_tuple(G: LinearGroup) -> tuple[Root, ...]:
+    """ Cached tuple of all roots of U for given group (see `Root.all_of_U`) """
+    return tuple(Root.all_of_U(G))
+
+
+def _roots_as_array(roots: Iterable[Root]) -> tuple[NDArray[np.intp], ...]:
+    """ Coordinates (k, i, j) of given roots as a tuple of arrays suitable for indexing """
+    coords = np.array([(r.k, r.i, r.j) for r in roots], dtype=np.intp).reshape(-1, 3)
+    return tuple(coords.T)
+
+
+def _lookup_roots(table: NDArray[np.intp], roots: list[Root], name: str) -> NDArray[np.intp]:
+    """ Indices of the given roots in a lookup table of the group (-1 for the roots not in the set) """
+    coords = _roots_as_array(roots)
+    valid = np.ones(len(roots), dtype=bool)
+    for c, n in zip(coords, table.shape):
+        valid &= (c >= 0) & (c < n)
+    indices = np.full(len(roots), -1, dtype=np.intp)
+    indices[valid] = table[tuple(c[valid] for c in coords)]
+    if (indices < 0).any():
+        raise ValueError(f"Roots not in {name}: {[roots[i] for i in np.flatnonzero(indices < 0)]}")
+    return indices
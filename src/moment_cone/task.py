@@ -1,5 +1,9 @@
 import contextlib
 import itertools
+import os
+import pickle
+import select
+import signal
 import time
 from contextlib import contextmanager
 import logging
@@ -13,6 +17,7 @@ __all__ = (
     "TimeOutException",
     "timeout",
     "timeout_process",
+    "timeout_fork",
 )
 
 class Task(contextlib.AbstractContextManager["Task"]):
@@ -318,3 +323,70 @@ def timeout_process(
             return result.get(timeout=timeout)
         except TimeoutError:
             raise TimeOutException("Time is out!")
+
+def timeout_fork(
+        f: Callable[[Unpack[Ts]], T],
+        args: tuple[Unpack[Ts]],
+        timeout: Optional[float] = None
+    ) -> T:
+    """
+    Limits the wall execution time of a given function by running it in a forked process
+
+    Negative or zero timeout disable the execution time.
+
+    Raise TimeOutException when execution reach the given limit, the forked
+    process being then killed. Unlike `timeout_process`, it can be used in the
+    (daemonic) worker processes of a parallel executor, that cannot create
+    children through multiprocessing. Unlike the `timeout` alarm, an interrupted
+    computation doesn't leave the calling process (and Sage) in an incorrect
+    state and the worker can be reused. Only available on POSIX systems.
+
+    >>> timeout_fork(pow, (2, 10), timeout=10)
+    1024
+    >>> try:
+    ...     timeout_fork(time.sleep, (10,), timeout=0.1)
+    ... except TimeOutException:
+    ...     print("Time is out!")
+    Time is out!
+    """
+    if timeout is None or timeout <= 0:
+        return f(*args)
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # Child process: sends the pickled result (or exception) to the parent
+        try:
+            os.close(read_fd)
+            try:
+                payload = pickle.dumps((True, f(*args)))
+            except Exception as e:
+                payload = pickle.dumps((False, e))
+            with os.fdopen(write_fd, "wb") as fh:
+                fh.write(payload)
+        finally:
+            os._exit(0)
+
+    os.close(write_fd)
+    chunks: list[bytes] = []
+    deadline = time.monotonic() + timeout
+    try:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([read_fd], [], [], remaining)[0]:
+                os.kill(pid, signal.SIGKILL)
+                raise TimeOutException("Time is out!")
+            chunk = os.read(read_fd, 1 << 16)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        os.close(read_fd)
+        os.waitpid(pid, 0)
+
+    if not chunks:
+        raise RuntimeError("The forked process exited without result")
+    success, value = pickle.loads(b"".join(chunks))
+    if not success:
+        raise value
+    return value
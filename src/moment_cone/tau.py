@@ -299,6 +299,25 @@ class Tau:
         """
         return self.grading_roots_in(Root.all_of_U(self.G))
 
+    @cached_property
+    def grading_rootsU_mask(self) -> dict[int, int]:
+        """
+        Same as `grading_rootsU` but with each eigen space encoded as a bitmask (see `Root.mask_of_U`).
+
+        >>> tau = Tau(((3, 2, 2), (4, 2, 1), (3, 2), (-7,)))
+        >>> gr = tau.grading_rootsU_mask
+        >>> for k in sorted(gr.keys()):
+        ...     print(f"{k}:", bin(gr[k]))
+        0: 0b100
+        1: 0b1100011
+        2: 0b1000
+        3: 0b10000
+        """
+        return {
+            x: Root.mask_of_U(roots, self.G)
+            for x, roots in self.grading_rootsU.items()
+        }
+
     @cached_property
     def grading_rootsB(self) -> dict[int, list[Root]]:
         return self.grading_roots_in(Root.all_of_B(self.G))
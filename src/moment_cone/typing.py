@@ -8,7 +8,7 @@ __all__ = (
     "Sequence", "MutableSequence", "Sized", "Callable", "Hashable",
     "ABC", "abstractmethod",
     "T", "Ts", "T_co", "U",
-    "Method",
+    "Method", "TPiStorage",
 )
 
 from typing import Type, NewType, TypeVar, TypeGuard, Generic, Optional
@@ -27,5 +27,8 @@ T_co = TypeVar('T_co')
 U = TypeVar('U') # Template parameter for generic classes or functions
 
 # Method kind used in different parts of the algorithm
-Method = Literal["probabilistic", "symbolic","symbolic_int"]
+Method = Literal["probabilistic", "symbolic","symbolic_int", "modular"]
+
+# Storage of the tensors returned by Representation.T_Pi_3D
+TPiStorage = Literal["dense", "sparse", "memmap"]
 
@@ -5,6 +5,7 @@ import functools
 import operator
 import logging
 from collections.abc import Hashable
+from collections import OrderedDict
 
 __all__ = (
     "is_decreasing",
@@ -35,6 +36,7 @@ __all__ = (
     "merge_factorizations",
     "PartialFunction",
     "clear_cached_property",
+    "LRUCache",
 )
 
 
@@ -731,3 +733,93 @@ def clear_cached_property(obj: Any) -> None:
     # dir and __dict__ so that intersection indicates cached_property
     for prop in set(dir(obj)) & obj.__dict__.keys():
         del obj.__dict__[prop]
+
+
+class LRUCache(Generic[T, U]):
+    """ Dictionary-like cache of bounded size with Least Recently Used eviction
+
+    The hits, misses and evictions are counted. An unbounded cache is obtained
+    with maxsize=None.
+
+    >>> cache = LRUCache(maxsize=2)
+    >>> cache["a"] = 1
+    >>> cache["b"] = 2
+    >>> cache["a"]
+    1
+    >>> cache["c"] = 3 # "b" is the least recently used
+    >>> "b" in cache, "a" in cache
+    (False, True)
+    >>> cache.get("b", 0)
+    0
+    >>> cache
+    LRUCache(#cache=2/2, #hit=1, #miss=1, #eviction=1)
+    """
+    data: OrderedDict[T, U]
+    maxsize: Optional[int]
+    hits: int
+    misses: int
+    evictions: int
+
+    def __init__(self, maxsize: Optional[int] = None):
+        self.data = OrderedDict()
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __contains__(self, key: T) -> bool:
+        """ Check if a key is in the cache (without counting nor updating its recency) """
+        return key in self.data
+
+    def __getitem__(self, key: T) -> U:
+        try:
+            value = self.data[key]
+        except KeyError:
+            self.misses += 1
+            raise
+        self.hits += 1
+        self.data.move_to_end(key)
+        return value
+
+    def get(self, key: T, default: Optional[U] = None) -> Optional[U]:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key: T, value: U) -> None:
+        self.data[key] = value
+        self.data.move_to_end(key)
+        if self.maxsize is not None:
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+                self.evictions += 1
+
+    def update(self, other: Mapping[T, U]) -> None:
+        """ Insert the given items (evicting the least recently used ones if needed) """
+        for key, value in other.items():
+            self[key] = value
+
+    def keys(self) -> Iterable[T]:
+        return self.data.keys()
+
+    def items(self) -> Iterable[tuple[T, U]]:
+        return self.data.items()
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self.data)
+
+    def clear(self) -> None:
+        """ Clear the cache content (but not the counters) """
+        self.data.clear()
+
+    def __repr__(self) -> str:
+        maxsize = "" if self.maxsize is None else f"/{self.maxsize}"
+        return (
+            f"{type(self).__name__}("
+            f"#cache={len(self.data)}{maxsize}, #hit={self.hits}, #miss={self.misses}, #eviction={self.evictions}"
+            ")"
+        )
@@ -0,0 +1,64 @@
+import unittest
+import random
+
+from moment_cone.bkr import Enumerate_delta, delta_equations, _enumerate_delta_polyhedron, PlethysmCache
+from moment_cone.partition import Partition
+from moment_cone.representation import KroneckerRepresentation, FermionRepresentation
+from moment_cone.rings import matrix, ZZ
+
+class TestBKR(unittest.TestCase):
+    def check_enumerate_delta(self, ListP: list[list[int]], sizenu, V) -> None:
+        """ The backtracking enumeration agrees with the Sage Polyhedron """
+        dim, points = Enumerate_delta(ListP, sizenu, V)
+        ref_dim, ref_points = _enumerate_delta_polyhedron(*delta_equations(ListP, sizenu, V), len(ListP))
+        self.assertEqual(dim, ref_dim)
+        self.assertEqual(sorted(tuple(p) for p in points), sorted(tuple(p) for p in ref_points))
+
+    def test_enumerate_delta_kronecker(self) -> None:
+        # One equation per non-negative entry of sizenu: sum of delta_j such that ListP[j][k] == i
+        V = KroneckerRepresentation((3, 3, 3, 1))
+        rng = random.Random(0)
+        for _ in range(50):
+            nrows, ncols, l = rng.randint(1, 3), rng.randint(1, 3), rng.randint(1, 5)
+            sizenu = matrix(ZZ, nrows, ncols, [rng.randint(-1, 3) for _ in range(nrows * ncols)])
+            ListP = [[rng.randrange(nrows) for _ in range(ncols)] for _ in range(l)]
+            if all(any(sizenu[P[k], k] >= 0 for k in range(ncols)) for P in ListP): # Bounded polyhedron
+                self.check_enumerate_delta(ListP, sizenu, V)
+
+    def test_enumerate_delta_particle(self) -> None:
+        # One equation per row of sizenu: sum of delta_j * ListP[j][row]
+        V = FermionRepresentation((4,), particle_cnt=2)
+        rng = random.Random(0)
+        for _ in range(50):
+            nrows, l = rng.randint(1, 3), rng.randint(1, 5)
+            sizenu = matrix(ZZ, nrows, 1, [rng.randint(0, 4) for _ in range(nrows)])
+            ListP = [[rng.randint(0, 2) for _ in range(nrows)] for _ in range(l)]
+            if all(any(P) for P in ListP): # Bounded polyhedron
+                self.check_enumerate_delta(ListP, sizenu, V)
+
+    def test_plethysm_cache(self) -> None:
+        import os, tempfile
+        pairs = [(Partition((2,)), Partition((2,))), (Partition((1, 1)), Partition((2,))), (Partition((3,)), Partition((2,)))]
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            # Load/save round-trip
+            file_prefix = os.path.join(cache_dir, "plethysm")
+            pc = PlethysmCache(track_computed=True)
+            products = [pc.product(*pair) for pair in pairs[:2]]
+            self.assertEqual(len(pc.pop_computed()), 2)
+            self.assertEqual(pc.pop_computed(), [])
+            pc.save_cache(file_prefix)
+
+            pc = PlethysmCache(file_prefix)
+            self.assertEqual([pc.product(*pair) for pair in pairs[:2]], products)
+            self.assertEqual(pc.misses, 0)
+
+            # The evicted decompositions are kept in the file when merging
+            pc = PlethysmCache(file_prefix, maxsize=1)
+            pc.product(*pairs[2])
+            self.assertEqual(pc.merge_cache(file_prefix), 1)
+            self.assertEqual(pc.merge_cache(file_prefix), 0)
+
+            pc = PlethysmCache(file_prefix)
+            self.assertEqual([pc.product(*pair) for pair in pairs], products + [PlethysmCache().product(*pairs[2])])
+            self.assertEqual(pc.misses, 0)
@@ -0,0 +1,49 @@
+import unittest
+import math
+
+import numpy as np
+
+from moment_cone.character_table import *
+from moment_cone.partition import Partition
+
+class TestCharacterTable(unittest.TestCase):
+    def test_orthogonality(self) -> None:
+        # Rows of the character table are orthonormal for the class sizes
+        for n in range(1, 9):
+            table = character_table(n).astype(object)
+            gram = (table * class_sizes(n)) @ table.T
+            self.assertTrue((gram == math.factorial(n) * np.eye(len(table), dtype=object)).all())
+
+    def test_class_sizes(self) -> None:
+        for n in range(1, 9):
+            self.assertEqual(sum(class_sizes(n)), math.factorial(n))
+
+    def test_kronecker(self) -> None:
+        a = Partition(3, 2, 1)
+        b = Partition(2, 2, 2)
+        c = Partition(2, 2, 1, 1)
+        product = kronecker_from_characters((a, b, c))
+        self.assertEqual(len(product), 11)
+        self.assertEqual(product[Partition(3, 2, 1)], 16)
+        self.assertEqual(sum(product.values()), 76)
+        self.assertEqual(kronecker_from_characters((a, b, c), Partition(4, 1, 1)), 10)
+        self.assertEqual(kronecker_from_characters((a, Partition(2, 1))), {})
+
+    def test_cache_dir(self) -> None:
+        import tempfile
+        with tempfile.TemporaryDirectory() as cache_dir:
+            table = character_table(6, cache_dir)
+            self.assertTrue(np.array_equal(character_table(6, cache_dir), table))
+
+    def test_kronecker_modular(self) -> None:
+        # The multi-modular products must match the exact ones with Python integers
+        n = 10
+        table = character_table(n).astype(object)
+        partitions = partitions_of(n)
+        for indices in ((3, 7, 20), (1, 35), (0, 12, 12, 28)):
+            rows = table[list(indices)]
+            exact = table @ (np.prod(rows, axis=0) * class_sizes(n)) // math.factorial(n)
+            product = kronecker_from_characters([partitions[i] for i in indices])
+            self.assertEqual(product, {partitions[i]: exact[i] for i in np.flatnonzero(exact)})
+            for i in range(0, len(partitions), 5):
+                self.assertEqual(kronecker_from_characters([partitions[j] for j in indices], partitions[i]), exact[i])
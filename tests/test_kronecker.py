@@ -12,7 +12,7 @@ class TestKronecker(unittest.TestCase):
         b = Partition(2, 2, 2)
         c = Partition(2, 2, 1, 1)
 
-        for cls in KroneckerCoefficient, KroneckerCoefficientCache, KroneckerCoefficientMLCache:
+        for cls in KroneckerCoefficient, KroneckerCoefficientCache, KroneckerCoefficientMLCache, KroneckerCoefficientCharacterTable:
             kc = cls()
             self.assertEqual(kc(partitions), 1607)
             self.assertEqual(kc(partitions[:3]), 1)
@@ -40,3 +40,53 @@ class TestKronecker(unittest.TestCase):
 
             product = kc.product(())
             self.assertEqual(product, dict())
+
+    def test_kronecker_db(self) -> None:
+        import os, tempfile
+        partitions = tuple(Partition(p) for p in ((3, 1, 1, 1, 1, 1), (4, 3, 1), (2, 2, 2, 2), (5, 1, 1, 1), (4, 2, 1,1)))
+
+        with tempfile.TemporaryDirectory() as db_dir:
+            # Computed coefficients are stored in the database and reused by another instance
+            file_name = os.path.join(db_dir, "kronecker.sqlite")
+            kc = KroneckerCoefficientDBCache(file_name)
+            self.assertEqual(kc(partitions), 1607)
+            kc.close()
+
+            kc = KroneckerCoefficientDBCache(file_name)
+            self.assertEqual(kc(partitions), 1607)
+            self.assertEqual(kc.misses, 0)
+
+            # Conversion from and to the .pkl.xz format
+            file_prefix = os.path.join(db_dir, "kronecker")
+            kc.save_cache(file_prefix)
+            kc.close()
+            converted = os.path.join(db_dir, "converted.sqlite")
+            self.assertEqual(convert_cache_to_db(file_prefix, converted), 3)
+            kc = KroneckerCoefficientDBCache(converted)
+            self.assertEqual(kc(partitions), 1607)
+            self.assertEqual(kc.misses, 0)
+            kc.close()
+
+    def test_kronecker_merge_cache(self) -> None:
+        import os, pickle, tempfile
+        partitions = tuple(Partition(p) for p in ((3, 1, 1, 1, 1, 1), (4, 3, 1), (2, 2, 2, 2), (5, 1, 1, 1), (4, 2, 1,1)))
+
+        with tempfile.TemporaryDirectory() as db_dir:
+            file_prefix = os.path.join(db_dir, "kronecker")
+            kc = KroneckerCoefficientMLCache()
+            kc(partitions[:3])
+            self.assertEqual(kc.merge_cache(file_prefix), 1)
+            self.assertEqual(kc.merge_cache(file_prefix), 0)
+
+            # Decompositions computed by another process through a shared temporary database
+            file_name = os.path.join(db_dir, "shared.sqlite")
+            shared = KroneckerCoefficientDBCache(file_name, temporary=True)
+            worker = pickle.loads(pickle.dumps(shared))
+            self.assertEqual(worker(partitions), 1607)
+            self.assertEqual(shared.merge_cache(file_prefix), 2)
+            shared.close()
+            self.assertFalse(os.path.exists(file_name))
+
+            kc = KroneckerCoefficientMLCache(file_prefix)
+            self.assertEqual(kc(partitions), 1607)
+            self.assertEqual(kc.misses, 0)
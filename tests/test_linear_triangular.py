@@ -0,0 +1,25 @@
+import unittest
+import itertools
+
+from moment_cone.linear_triangular import is_linear_triangular, is_linear_triangular_dense
+from moment_cone.linear_group import LinearGroup
+from moment_cone.representation import KroneckerRepresentation, FermionRepresentation
+from moment_cone.root import Root
+from moment_cone.tau import Tau
+
+class TestLinearTriangular(unittest.TestCase):
+    def test_sparse_vs_dense(self) -> None:
+        """ The sparse path-based test agrees with the dense reference """
+        cases = (
+            (KroneckerRepresentation(LinearGroup((2, 2, 2, 1))), Tau(((1, 0), (1, 0), (1, -1), (-1,)))),
+            (KroneckerRepresentation(LinearGroup((3, 2, 1))), Tau(((2, 1, 0), (1, 0), (-2,)))),
+            (FermionRepresentation(LinearGroup((4,)), particle_cnt=2), Tau(((3, 1, 0, -2),))),
+        )
+        for V, tau in cases:
+            roots = list(Root.all_of_U(V.G))
+            for size in range(len(roots) + 1):
+                for Invs in itertools.combinations(roots, size):
+                    self.assertEqual(
+                        is_linear_triangular(V, tau, list(Invs)),
+                        is_linear_triangular_dense(V, tau, list(Invs)),
+                    )
@@ -0,0 +1,23 @@
+import unittest
+import numpy as np
+
+from moment_cone.modular import MODULAR_PRIME, sqrt_minus_one, gaussian_mod_p, rank_mod_p
+
+class TestModular(unittest.TestCase):
+    def test_sqrt_minus_one(self) -> None:
+        for p in (5, 13, 97, MODULAR_PRIME):
+            i = sqrt_minus_one(p)
+            self.assertEqual((i * i) % p, p - 1)
+        with self.assertRaises(ValueError):
+            sqrt_minus_one(7)
+
+    def test_rank(self) -> None:
+        rng = np.random.default_rng(0)
+        real = rng.integers(-1000, 1000, size=(6, 6))
+        imag = rng.integers(-1000, 1000, size=(6, 6))
+        self.assertEqual(rank_mod_p(gaussian_mod_p(real, imag)), 6)
+
+        # Rank deficient matrix over QQ[I]: third column is (1 + I) * first column + second column
+        real[:, 2] = real[:, 0] - imag[:, 0] + real[:, 1]
+        imag[:, 2] = real[:, 0] + imag[:, 0] + imag[:, 1]
+        self.assertEqual(rank_mod_p(gaussian_mod_p(real, imag)), 5)
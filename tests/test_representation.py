@@ -66,3 +66,82 @@ class TestRepresentation(unittest.TestCase):
         V1 = BosonRepresentation((5,), particle_cnt=1, seed=0)
         V2 = BosonRepresentation((5,), particle_cnt=2, seed=0)
         self.assertNotEqual(V1._generate_seed("unittest"), V2._generate_seed("unittest"))
+
+    def test_indices_of_weights(self) -> None:
+        # Batched indices must match the index of each weight
+        for V in (
+            KroneckerRepresentation((3, 2, 4, 1), seed=0),
+            FermionRepresentation((6,), particle_cnt=3, seed=0),
+            BosonRepresentation((4,), particle_cnt=3, seed=0),
+        ):
+            weights = V.all_weights[::-2]
+            self.assertEqual(
+                V.indices_of_weights(weights).tolist(),
+                [V.index_of_weight(chi, use_internal_index=False) for chi in weights],
+            )
+
+    def test_tpi_storage(self) -> None:
+        # Sparse and memory-mapped storages must give the same slices as the dense one
+        import numpy as np
+        import tempfile
+        with tempfile.TemporaryDirectory() as tpi_dir:
+            for V in (
+                KroneckerRepresentation((3, 2, 2, 1), seed=0, random_deep=2),
+                FermionRepresentation((5,), particle_cnt=2, seed=0, random_deep=2),
+            ):
+                dense = V.T_Pi_3D
+                for storage in ("sparse", "memmap"):
+                    W = V.reduce(V.G, tpi_storage=storage, tpi_dir=tpi_dir)
+                    self.assertIsNot(V, W)
+                    rows, cols, roots = range(0, V.dim, 2), range(1, V.dim), range(V.G.dimU)
+                    for method, kind in (("probabilistic", "imaginary"), ("probabilistic", "line")):
+                        key = np.ix_([0, 3], rows, cols, roots)
+                        self.assertTrue(np.array_equal(
+                            W.T_Pi_3D(method, kind)[key].sum(axis=1),
+                            dense(method, kind)[key].sum(axis=1),
+                        ))
+                    key = np.ix_(rows, cols, roots)
+                    self.assertTrue(np.array_equal(
+                        W.T_Pi_3D("symbolic_int")[key].sum(axis=0),
+                        dense("symbolic_int")[key].sum(axis=0),
+                    ))
+
+    def test_graph_edges(self) -> None:
+        from moment_cone.root import Root
+        for V in (KroneckerRepresentation((3, 2, 1)), FermionRepresentation((4,), particle_cnt=2), BosonRepresentation((3,), particle_cnt=2)):
+            roots = list(Root.all_of_U(V.G))
+            sources, targets = V.graph_edges(roots)
+            MG = V.Matrix_Graph(roots)
+            self.assertEqual(
+                sorted(MG.nonzero_positions()),
+                sorted(zip(targets.tolist(), sources.tolist())),
+            )
+
+            # Union of the edges of the roots, duplicates being removed
+            edges = set()
+            for alpha in roots:
+                alpha_sources, alpha_targets = V.graph_edges([alpha])
+                edges |= set(zip(alpha_sources.tolist(), alpha_targets.tolist()))
+            self.assertEqual(edges, set(zip(sources.tolist(), targets.tolist())))
+
+    def test_tpi_modular(self) -> None:
+        import numpy as np
+        from moment_cone.modular import gaussian_mod_p
+        V = KroneckerRepresentation((2, 3, 2, 1), random_deep=2)
+        QI = V.T_Pi_3D("probabilistic", "imaginary")
+        QI_mod = V.T_Pi_3D("modular", "imaginary")
+        self.assertEqual(QI_mod.dtype, np.uint64)
+        for p in range(V.random_deep):
+            self.assertTrue(np.array_equal(QI_mod[p], gaussian_mod_p(QI[2 * p], QI[2 * p + 1])))
+
+    def test_tpi_lazy_points(self) -> None:
+        # The tensors of a random point are only built when accessed
+        import numpy as np
+        V = KroneckerRepresentation((2, 2, 2, 1), seed=0, random_deep=3)
+        QI = V.T_Pi_3D("probabilistic", "imaginary")
+        self.assertEqual(QI.built_points, [])
+        key = np.ix_([2, 3], range(V.dim), range(V.dim), range(V.G.dimU))
+        slice_1 = QI[key]
+        self.assertEqual(QI.built_points, [1])
+        self.assertTrue(np.array_equal(slice_1, QI.toarray()[2:4]))
+        self.assertEqual(QI.built_points, [0, 1, 2])
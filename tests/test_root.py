@@ -40,4 +40,24 @@ class TestRoot(unittest.TestCase):
             Root(2, 1, 3),
             Root(5, 2, 1),
         }
-        self.assertEqual(s, s_ref)
\ No newline at end of file
+        self.assertEqual(s, s_ref)
+
+    def test_mask_of_U(self) -> None:
+        G = LinearGroup((2, 3, 4))
+        all_r = tuple(Root.all_of_U(G))
+        roots = (all_r[1], all_r[4], all_r[9])
+
+        mask = Root.mask_of_U(roots, G)
+        self.assertEqual(mask, (1 << 1) | (1 << 4) | (1 << 9))
+        self.assertEqual(Root.from_mask_of_U(mask, G), roots)
+        self.assertEqual(Root.indices_from_mask(mask).tolist(), [1, 4, 9])
+        self.assertEqual(Root.mask_of_U((), G), 0)
+        self.assertEqual(Root.from_mask_of_U(0, G), ())
+
+    def test_indices_in_all_of(self) -> None:
+        G = LinearGroup((2, 3, 4))
+        all_U = tuple(Root.all_of_U(G))
+        all_K = tuple(Root.all_of_K(G))
+        self.assertEqual(Root.indices_in_all_of_U(all_U, G).tolist(), list(range(len(all_U))))
+        self.assertEqual(Root.indices_in_all_of_K(all_K, G).tolist(), list(range(len(all_K))))
+        self.assertEqual(len(Root.indices_in_all_of_U((), G)), 0)